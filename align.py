@@ -3,16 +3,23 @@
 from __future__ import annotations
 
 import argparse
-import json
+import contextlib
+import functools
+import math
 import os
 import sys
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence
+from typing import Any, Deque, Dict, Iterable, List, Optional, Sequence, Tuple, Union
 
 from whisperx import DiarizationPipeline, load_align_model, load_audio
 from whisperx import align as whisperx_align
 
+import cache as result_cache
+import jsonio
+
 
 class AlignmentError(RuntimeError):
     """Raised when alignment could not be completed."""
@@ -26,88 +33,299 @@ class AlignerConfig:
     language_code: Optional[str] = None
     diarize: bool = False
     diarization_auth_token: Optional[str] = None
+    use_cache: bool = True
+    compute_type: str = "float32"
+
+
+_SAMPLE_RATE = 16000
+_WINDOW_PAD_S = 0.5
+
+_active_device: Optional[str] = None
+
+
+@functools.lru_cache(maxsize=4)
+def _load_align_cached(language_code: Optional[str], device: str) -> Tuple[Any, Any]:
+    """Return ``(model, metadata)`` shared by every aligner in the process."""
+
+    return load_align_model(language_code=language_code, device=device)
+
+
+@functools.lru_cache(maxsize=2)
+def _load_align_int8_cached(language_code: Optional[str]) -> Tuple[Any, Any]:
+    """Return the CPU align model with its ``nn.Linear`` layers dynamically quantised to int8.
+
+    The float32 model stays in :func:`_load_align_cached` for float32 aligners.
+    """
+
+    import torch
+
+    model, metadata = _load_align_cached(language_code, "cpu")
+    quantized = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return quantized, metadata
+
+
+@functools.lru_cache(maxsize=2)
+def _load_diarizer_cached(auth_token: Optional[str], device: str) -> DiarizationPipeline:
+    return DiarizationPipeline(use_auth_token=auth_token, device=device)
+
+
+def _use_device(device: str) -> None:
+    """Drop cached models when the target device changes so their memory can be freed."""
+
+    global _active_device
+    if _active_device is not None and _active_device != device:
+        _load_align_cached.cache_clear()
+        _load_align_int8_cached.cache_clear()
+        _load_diarizer_cached.cache_clear()
+        try:
+            import torch
+        except ImportError:  # pragma: no cover - torch ships with whisperx
+            pass
+        else:
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+    _active_device = device
+
+
+def _load_audio_window(audio_path: Path, segments: Sequence[Dict[str, Any]]) -> Tuple[Any, float]:
+    """Return ``(audio, offset_s)`` covering only the span of ``segments``.
+
+    16-bit PCM WAVs (the bot's 48 kHz stereo recordings included) are mapped
+    and resampled by :func:`transcribe._load_pcm16k` for just that window;
+    anything else goes through WhisperX' full ffmpeg decode with a zero offset.
+    """
+
+    t_min = max(0.0, min(float(seg["start"]) for seg in segments) - _WINDOW_PAD_S)
+    t_max = max(float(seg["end"]) for seg in segments) + _WINDOW_PAD_S
+    try:
+        # Imported lazily: transcribe imports this module lazily as well.
+        from transcribe import _load_pcm16k, _probe_wav
+    except ImportError:  # pragma: no cover - align.py used without transcribe.py
+        return load_audio(str(audio_path)), 0.0
+    header = _probe_wav(str(audio_path), os.path.getsize(audio_path))
+    if header is not None:
+        start_frame = int(t_min * header.sample_rate)
+        audio = _load_pcm16k(
+            str(audio_path),
+            header,
+            start_frame=start_frame,
+            stop_frame=math.ceil(t_max * header.sample_rate),
+        )
+        if audio is not None:
+            return audio, start_frame / header.sample_rate
+    return load_audio(str(audio_path)), 0.0
 
 
 class WhisperWordAligner:
-    """Run WhisperX alignment for a given audio file and segments."""
+    """Run WhisperX alignment for a given audio file and segments.
+
+    Models are cached per process, keyed by language and device, so creating a
+    new aligner for every file does not reload them. Call :meth:`preload` to
+    pay the loading cost up front, e.g. before the first file in a GUI session.
+    """
 
     def __init__(self, config: Optional[AlignerConfig] = None):
         self.config = config or AlignerConfig()
         self._align_model = None
         self._align_metadata = None
         self._diarizer: Optional[DiarizationPipeline] = None
+        self._stream = None
+
+    @classmethod
+    def preload(cls, config: Optional[AlignerConfig] = None) -> "WhisperWordAligner":
+        """Return an aligner whose models are already loaded into the process cache."""
+
+        aligner = cls(config)
+        aligner._ensure_align_model()
+        if aligner.config.diarize:
+            aligner._ensure_diarizer()
+        return aligner
 
     def _ensure_align_model(self) -> None:
         if self._align_model is None or self._align_metadata is None:
-            language = self.config.language_code
-            self._align_model, self._align_metadata = load_align_model(
-                language_code=language,
-                device=self.config.device,
+            _use_device(self.config.device)
+            if self.config.compute_type == "int8" and self.config.device == "cpu":
+                self._align_model, self._align_metadata = _load_align_int8_cached(
+                    self.config.language_code
+                )
+                return
+            self._align_model, self._align_metadata = _load_align_cached(
+                self.config.language_code,
+                self.config.device,
             )
 
     def _ensure_diarizer(self) -> None:
         if self._diarizer is None:
             auth_token = self.config.diarization_auth_token or os.environ.get("PYANNOTE_AUTH_TOKEN")
-            self._diarizer = DiarizationPipeline(use_auth_token=auth_token, device=self.config.device)
+            _use_device(self.config.device)
+            self._diarizer = _load_diarizer_cached(auth_token, self.config.device)
 
-    def align_words(
+    def _prepare(
         self,
         audio_path: Path,
         segments: Sequence[Dict[str, Any]],
-    ) -> List[List[Dict[str, Any]]]:
-        """Return word-level timestamps for ``segments`` aligned to ``audio_path``."""
+    ) -> Tuple[Any, float, List[Dict[str, Any]]]:
+        audio, offset = _load_audio_window(audio_path, segments)
+        prepared_segments = [
+            {
+                "start": float(seg["start"]) - offset,
+                "end": float(seg["end"]) - offset,
+                "text": str(seg["text"]),
+            }
+            for seg in segments
+        ]
+        return audio, offset, prepared_segments
 
-        if not segments:
-            return []
+    def _forward_context(self) -> contextlib.AbstractContextManager:
+        """Return the context for the alignment forward pass.
 
-        self._ensure_align_model()
-        try:
-            audio = load_audio(str(audio_path))
-            prepared_segments = [
-                {
-                    "start": float(seg["start"]),
-                    "end": float(seg["end"]),
-                    "text": str(seg["text"]),
-                }
-                for seg in segments
-            ]
-            result = whisperx_align(
+        On CUDA the pass runs on a side stream owned by this aligner, so its
+        kernels can overlap with Whisper decoding instead of queueing behind
+        the default stream. With ``compute_type="float16"`` the wav2vec2
+        forward also runs under autocast while the weights stay in float32, so
+        the cached model can be shared with float32 aligners. ``log_softmax``
+        is autocast to float32, which keeps the trellis and backtracking (the
+        timestamps) in full precision. On CPU ``compute_type="int8"`` is
+        handled when the model is loaded.
+        """
+
+        if not self.config.device.startswith("cuda"):
+            return contextlib.nullcontext()
+        import torch
+
+        if self._stream is None:
+            self._stream = torch.cuda.Stream(device=self.config.device)
+        # Weights and inputs were produced on the default stream; start after them.
+        self._stream.wait_stream(torch.cuda.current_stream(self.config.device))
+        stack = contextlib.ExitStack()
+        stack.enter_context(torch.inference_mode())
+        stack.enter_context(torch.cuda.stream(self._stream))
+        if self.config.compute_type == "float16":
+            stack.enter_context(torch.autocast(device_type="cuda", dtype=torch.float16))
+        return stack
+
+    def _align_prepared(self, audio: Any, prepared_segments: List[Dict[str, Any]]) -> Dict[str, Any]:
+        with self._forward_context():
+            return whisperx_align(
                 prepared_segments,
                 self._align_model,
                 self._align_metadata,
                 audio,
                 device=self.config.device,
             )
-        except Exception as exc:  # pragma: no cover - runtime safeguard
-            raise AlignmentError(str(exc)) from exc
 
-        aligned_segments = result.get("segments", [])
+    @staticmethod
+    def _collect_words(result: Dict[str, Any], offset: float) -> List[List[Dict[str, Any]]]:
+        """Turn WhisperX segments into per-segment word dicts shifted by ``offset``.
+
+        Words without both timestamps or with an empty token are dropped.
+        """
+
         words: List[List[Dict[str, Any]]] = []
-        for seg in aligned_segments:
+        for seg in result.get("segments", []):
             segment_words: List[Dict[str, Any]] = []
-            for word in seg.get("words", []) or []:
+            for word in seg.get("words") or ():
                 start = word.get("start")
                 end = word.get("end")
+                if start is None or end is None:
+                    continue
                 token = word.get("word") or word.get("text") or word.get("token")
-                if token is None or start is None or end is None:
+                if token is None:
                     continue
                 token = str(token).strip()
-                if not token:
-                    continue
-                segment_words.append({
-                    "text": token,
-                    "start": float(start),
-                    "end": float(end),
-                })
+                if token:
+                    segment_words.append(
+                        {"text": token, "start": float(start) + offset, "end": float(end) + offset}
+                    )
             words.append(segment_words)
         return words
 
+    def align_words(
+        self,
+        audio_path: Path,
+        segments: Sequence[Dict[str, Any]],
+    ) -> List[List[Dict[str, Any]]]:
+        """Return word-level timestamps for ``segments`` aligned to ``audio_path``."""
+
+        if not segments:
+            return []
+
+        self._ensure_align_model()
+        try:
+            audio, offset, prepared_segments = self._prepare(audio_path, segments)
+            result = self._align_prepared(audio, prepared_segments)
+        except Exception as exc:  # pragma: no cover - runtime safeguard
+            raise AlignmentError(str(exc)) from exc
+        return self._collect_words(result, offset)
+
+    def align_words_batch(
+        self,
+        items: Sequence[Tuple[Path, Sequence[Dict[str, Any]]]],
+        *,
+        max_workers: Optional[int] = None,
+    ) -> List[Union[List[List[Dict[str, Any]]], AlignmentError]]:
+        """Align several ``(audio_path, segments)`` pairs, keeping the device busy.
+
+        Audio for the next files is read in a thread pool while the current one
+        aligns; the alignment passes themselves run one at a time, in order, on
+        the configured device. Each entry of the result is what
+        :meth:`align_words` returns for that item, or the :class:`AlignmentError`
+        it would raise, so one bad file does not cost the others their words.
+        """
+
+        if not items:
+            return []
+
+        self._ensure_align_model()
+        workers = max_workers or min(len(items), os.cpu_count() or 1)
+        results: List[Union[List[List[Dict[str, Any]]], AlignmentError]] = []
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending: Deque[Optional[Future]] = deque()
+            queued = iter(items)
+
+            def _submit_next() -> None:
+                for audio_path, segments in queued:
+                    pending.append(pool.submit(self._prepare, audio_path, segments) if segments else None)
+                    return
+
+            for _ in range(workers):
+                _submit_next()
+            while pending:
+                future = pending.popleft()
+                _submit_next()
+                if future is None:
+                    results.append([])
+                    continue
+                try:
+                    audio, offset, prepared_segments = future.result()
+                    result = self._align_prepared(audio, prepared_segments)
+                except Exception as exc:
+                    error = AlignmentError(str(exc))
+                    error.__cause__ = exc
+                    results.append(error)
+                    continue
+                results.append(self._collect_words(result, offset))
+        return results
+
     def diarize(self, audio_path: Path) -> Optional[List[Dict[str, Any]]]:
         """Run diarization for ``audio_path`` when enabled in the configuration."""
 
         if not self.config.diarize:
             return None
 
+        cache_key = None
+        if self.config.use_cache:
+            cache_key = result_cache.make_key(
+                "diarize",
+                result_cache.file_digest(audio_path),
+                result_cache.package_version("whisperx"),
+                result_cache.package_version("pyannote.audio"),
+                _SAMPLE_RATE,
+            )
+            cached = result_cache.get(cache_key)
+            if cached is not None:
+                return cached
+
         self._ensure_diarizer()
         annotation = self._diarizer(str(audio_path))
         diarization: List[Dict[str, Any]] = []
@@ -119,6 +337,8 @@ class WhisperWordAligner:
                     "end": float(segment.end),
                 }
             )
+        if cache_key is not None:
+            result_cache.put(cache_key, diarization)
         return diarization
 
 
@@ -147,10 +367,21 @@ def main() -> None:
         action="store_true",
         help="Włącz diarization (wymaga PYANNOTE_AUTH_TOKEN)",
     )
+    parser.add_argument(
+        "--compute-type",
+        choices=("float32", "float16", "int8"),
+        default="float32",
+        help="Precyzja przebiegu modelu wyrównania (float16 tylko na cuda, int8 tylko na cpu)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Nie korzystaj z cache diarization (~/.cache/skrybson_ai)",
+    )
     args = parser.parse_args()
 
-    with args.segments.open("r", encoding="utf-8") as f:
-        payload = json.load(f)
+    payload = jsonio.read(args.segments)
     segments = payload.get("segments")
     if segments is None:
         raise SystemExit("JSON musi zawierać klucz 'segments'.")
@@ -160,6 +391,8 @@ def main() -> None:
             device=args.device,
             language_code=args.language,
             diarize=args.diarize,
+            use_cache=args.use_cache,
+            compute_type=args.compute_type,
         )
     )
     words = aligner.align_words(args.audio, segments)
@@ -170,9 +403,9 @@ def main() -> None:
             result["diarization"] = diarization
 
     if args.output:
-        args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+        jsonio.write(args.output, result)
     else:
-        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.buffer.write(jsonio.dumps(result))
 
 
 if __name__ == "__main__":  # pragma: no cover - CLI entrypoint
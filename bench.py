@@ -3,20 +3,37 @@
 from __future__ import annotations
 
 import argparse
-import json
+import functools
+import gc
 import math
+import os
 import re
+import socketserver
 import statistics
 import time
-from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import cache as result_cache
+import jsonio
 
 try:
     import torch  # type: ignore
 except Exception:  # pragma: no cover - torch is optional for CPU runs
     torch = None
 
+try:
+    import numpy as np  # type: ignore
+except Exception:  # pragma: no cover - numpy is optional, pure Python fallback below
+    np = None
+
+try:
+    from numba import njit  # type: ignore
+except Exception:  # pragma: no cover - numba is optional, NumPy fallback below
+    njit = None
+
 
 @dataclass
 class Sample:
@@ -27,10 +44,19 @@ class Sample:
     description: str
     reference_text: str
     audio_path: Optional[Path]
+    ref_words: List[str] = field(init=False, repr=False)
+    ref_chars: str = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # The reference is scored against every model, normalise it only once.
+        self.ref_words = normalize_words(self.reference_text)
+        self.ref_chars = "".join(self.ref_words)
 
 
 DEFAULT_MODELS = ["small", "medium", "large-v3"]
 
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description=__doc__)
@@ -69,6 +95,31 @@ def parse_args() -> argparse.Namespace:
         default="auto",
         help="Typ obliczeń faster-whisper (np. float16, int8_float16).",
     )
+    parser.add_argument(
+        "--batch-size",
+        dest="batch_size",
+        type=int,
+        default=16,
+        help="Rozmiar batcha BatchedInferencePipeline (1 wyłącza batchowanie).",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Liczba procesów liczących metryki (0 = wszystkie rdzenie).",
+    )
+    parser.add_argument(
+        "--cache",
+        dest="use_cache",
+        action="store_true",
+        help="Używaj zapisanych transkrypcji z ~/.cache/skrybson_ai (próbki z cache nie mają czasu ani VRAM).",
+    )
+    parser.add_argument(
+        "--serve",
+        type=Path,
+        metavar="SOCKET",
+        help="Tryb serwera: trzymaj modele w pamięci i odpowiadaj na żądania JSON na gnieździe Unix.",
+    )
     parser.add_argument(
         "--run-models",
         action="store_true",
@@ -78,7 +129,7 @@ def parse_args() -> argparse.Namespace:
 
 
 def load_manifest(path: Path) -> Dict[str, Sample]:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = jsonio.read(path)
     mapping: Dict[str, Sample] = {}
     for entry in payload.get("samples", []):
         sample = Sample(
@@ -95,16 +146,15 @@ def load_manifest(path: Path) -> Dict[str, Sample]:
 
 
 def load_precomputed(path: Path) -> Dict[str, Dict[str, dict]]:
-    payload = json.loads(path.read_text(encoding="utf-8"))
+    payload = jsonio.read(path)
     models: Dict[str, Dict[str, dict]] = {}
     for model in payload.get("models", []):
-        runs = {}
-        for run in model.get("runs", []):
-            runs[run["sample_id"]] = run
         models[model["name"]] = {
             "device": model.get("device"),
             "compute_type": model.get("compute_type"),
-            "runs": runs,
+            "batch_size": model.get("batch_size"),
+            "vad_filter": model.get("vad_filter"),
+            "runs": {run["sample_id"]: run for run in model.get("runs", [])},
         }
     if not models:
         raise ValueError(f"Plik {path} nie zawiera danych o modelach")
@@ -112,41 +162,172 @@ def load_precomputed(path: Path) -> Dict[str, Dict[str, dict]]:
 
 
 def normalize_words(text: str) -> List[str]:
-    return re.findall(r"\w+", text.lower(), flags=re.UNICODE)
+    return _WORD_RE.findall(text.lower())
+
+
+def normalize_chars(text: str) -> str:
+    return "".join(normalize_words(text))
+
+
+def _lev_band(ref, hyp, band, rows):
+    """Levenshtein DP restricted to the diagonal band ``|i - j| <= band``.
+
+    ``rows`` holds the previous and current DP rows back to back and must have
+    at least ``2 * (len(hyp) + 1)`` slots. Cells outside the band count as
+    unreachable, so the result is exact whenever it is ``<= band`` (a path of
+    cost ``d`` never leaves the band of width ``d``). ``band`` must be at least
+    ``|len(ref) - len(hyp)|``. The same source runs as plain Python over lists
+    and, compiled by numba, over int32 token ids.
+    """
+
+    n = len(ref)
+    m = len(hyp)
+    unreachable = n + m + 1
+    cols = m + 1
+    prev = 0
+    curr = cols
+    for j in range(min(m, band) + 1):
+        rows[j] = j
+    if band + 1 <= m:
+        rows[band + 1] = unreachable
+    for i in range(1, n + 1):
+        lo = max(1, i - band)
+        hi = min(m, i + band)
+        rows[curr] = i if i <= band else unreachable
+        if lo > 1:
+            rows[curr + lo - 1] = unreachable
+        ref_item = ref[i - 1]
+        for j in range(lo, hi + 1):
+            best = rows[prev + j] + 1
+            insertion = rows[curr + j - 1] + 1
+            if insertion < best:
+                best = insertion
+            substitution = rows[prev + j - 1]
+            if ref_item != hyp[j - 1]:
+                substitution += 1
+            if substitution < best:
+                best = substitution
+            rows[curr + j] = best
+        if hi < m:
+            rows[curr + hi + 1] = unreachable
+        prev, curr = curr, prev
+    return rows[prev + m]
+
+
+if njit is not None:
+    _lev_band_int = njit(cache=True, boundscheck=False)(_lev_band)
+else:
+    _lev_band_int = None
+
+
+def _lev_banded(ref, hyp, kernel, rows) -> int:
+    """Run ``kernel`` with a band starting at ``|len(ref) - len(hyp)| + 1``.
+
+    The band doubles until the distance fits inside it or covers the whole
+    matrix, so near-identical transcripts cost ``O(n * d)`` instead of
+    ``O(n * m)``.
+    """
+
+    longest = max(len(ref), len(hyp))
+    band = abs(len(ref) - len(hyp)) + 1
+    while True:
+        distance = int(kernel(ref, hyp, band, rows))
+        if distance <= band or band >= longest:
+            return distance
+        band *= 2
+
+
+def _lev_np(ref, hyp) -> int:
+    """Levenshtein DP vectorised along the hypothesis axis.
+
+    Deletions and substitutions only depend on the previous row, so they are
+    computed with one ``np.minimum``. Insertions chain left-to-right; the chain
+    ``curr[j] = min(curr[j], curr[j - 1] + 1)`` is resolved in one pass as
+    ``j + cummin(curr[k] - k)``.
+    """
+
+    offsets = np.arange(hyp.shape[0] + 1, dtype=np.int32)
+    prev_row = offsets
+    for i, ref_item in enumerate(ref, start=1):
+        curr_row = np.empty_like(offsets)
+        curr_row[0] = i
+        np.minimum(prev_row[1:] + 1, prev_row[:-1] + (hyp != ref_item), out=curr_row[1:])
+        prev_row = np.minimum.accumulate(curr_row - offsets) + offsets
+    return int(prev_row[-1])
+
+
+_SCRATCH = np.empty(4096, dtype=np.int32) if np is not None else None
+
+
+def _scratch(size: int):
+    """Return the shared DP buffer, doubling it until it holds ``size`` ints."""
+
+    global _SCRATCH
+    if _SCRATCH.shape[0] < size:
+        capacity = _SCRATCH.shape[0]
+        while capacity < size:
+            capacity *= 2
+        _SCRATCH = np.empty(capacity, dtype=np.int32)
+    return _SCRATCH
+
+
+def _encode_tokens(tokens: Sequence[str], interner: Dict[str, int]):
+    """Map ``tokens`` to int32 ids, sharing ``interner`` between calls."""
+
+    return np.fromiter(
+        (interner.setdefault(token, len(interner)) for token in tokens),
+        dtype=np.int32,
+        count=len(tokens),
+    )
 
 
-def normalize_chars(text: str) -> List[str]:
-    return list("".join(normalize_words(text)))
+def _token_distance(ref: Sequence[str], hyp: Sequence[str], interner: Dict[str, int]) -> int:
+    if np is None:
+        return _lev_banded(ref, hyp, _lev_band, [0] * (2 * (len(hyp) + 1)))
+    ref_ids = _encode_tokens(ref, interner)
+    hyp_ids = _encode_tokens(hyp, interner)
+    if _lev_band_int is not None:
+        return _lev_banded(ref_ids, hyp_ids, _lev_band_int, _scratch(2 * (len(hyp_ids) + 1)))
+    return _lev_np(ref_ids, hyp_ids)
+
+
+def _char_distance(ref: str, hyp: str) -> int:
+    """Edit distance between two strings, scored per code point.
+
+    With NumPy the UTF-32 encoding is viewed directly as an int32 id array, so
+    no per-character ``str`` objects or interner lookups are needed.
+    """
+
+    if np is None:
+        return _lev_banded(ref, hyp, _lev_band, [0] * (2 * (len(hyp) + 1)))
+    ref_ids = np.frombuffer(ref.encode("utf-32-le"), dtype=np.int32)
+    hyp_ids = np.frombuffer(hyp.encode("utf-32-le"), dtype=np.int32)
+    if _lev_band_int is not None:
+        return _lev_banded(ref_ids, hyp_ids, _lev_band_int, _scratch(2 * (len(hyp_ids) + 1)))
+    return _lev_np(ref_ids, hyp_ids)
 
 
 def levenshtein(ref: Iterable[str], hyp: Iterable[str]) -> int:
-    ref_list = list(ref)
-    hyp_list = list(hyp)
-    if not ref_list:
-        return len(hyp_list)
-    if not hyp_list:
-        return len(ref_list)
-    prev_row = list(range(len(hyp_list) + 1))
-    for i, ref_item in enumerate(ref_list, start=1):
-        curr_row = [i]
-        for j, hyp_item in enumerate(hyp_list, start=1):
-            insertion = curr_row[j - 1] + 1
-            deletion = prev_row[j] + 1
-            substitution = prev_row[j - 1] + (0 if ref_item == hyp_item else 1)
-            curr_row.append(min(insertion, deletion, substitution))
-        prev_row = curr_row
-    return prev_row[-1]
-
-
-def compute_metrics(reference: str, hypothesis: str) -> Dict[str, float]:
-    ref_words = normalize_words(reference)
+    return _token_distance(list(ref), list(hyp), {})
+
+
+def compute_metrics(
+    reference: str,
+    hypothesis: str,
+    *,
+    ref_words: Optional[List[str]] = None,
+    ref_chars: Optional[str] = None,
+) -> Dict[str, float]:
+    interner: Dict[str, int] = {}
+    if ref_words is None:
+        ref_words = normalize_words(reference)
     hyp_words = normalize_words(hypothesis)
-    word_distance = levenshtein(ref_words, hyp_words)
+    word_distance = _token_distance(ref_words, hyp_words, interner)
     wer = word_distance / len(ref_words) if ref_words else math.nan
 
-    ref_chars = normalize_chars(reference)
-    hyp_chars = normalize_chars(hypothesis)
-    char_distance = levenshtein(ref_chars, hyp_chars)
+    if ref_chars is None:
+        ref_chars = "".join(ref_words)
+    char_distance = _char_distance(ref_chars, "".join(hyp_words))
 
     return {
         "wer": wer,
@@ -156,37 +337,204 @@ def compute_metrics(reference: str, hypothesis: str) -> Dict[str, float]:
     }
 
 
+ScoreTask = Tuple[str, str, str, str]
+
+
+def _warm_numba() -> None:
+    """Load the compiled Levenshtein kernel once per worker process."""
+
+    if _lev_band_int is not None:
+        ids = np.zeros(1, dtype=np.int32)
+        _lev_band_int(ids, ids, 1, _scratch(4))
+
+
+def _score_one(task: ScoreTask) -> Tuple[str, str, Dict[str, float]]:
+    model_name, sample_id, reference, hypothesis = task
+    return model_name, sample_id, compute_metrics(reference, hypothesis)
+
+
+def score_runs(
+    models_data: Dict[str, Dict[str, dict]],
+    samples: Dict[str, Sample],
+    jobs: int = 1,
+) -> Dict[Tuple[str, str], Dict[str, float]]:
+    """Compute metrics for every (model, sample) pair, optionally across processes."""
+
+    tasks: List[ScoreTask] = []
+    for model_name, data in models_data.items():
+        runs = data["runs"]
+        for sample_id, sample in samples.items():
+            run = runs.get(sample_id)
+            if not run:
+                raise KeyError(f"Brak wyników modelu {model_name} dla próbki {sample_id}")
+            tasks.append((model_name, sample_id, sample.reference_text, run["transcript"]))
+
+    workers = min(len(tasks), jobs if jobs > 0 else os.cpu_count() or 1)
+    if workers <= 1:
+        return {
+            (model_name, sample_id): compute_metrics(
+                reference,
+                hypothesis,
+                ref_words=samples[sample_id].ref_words,
+                ref_chars=samples[sample_id].ref_chars,
+            )
+            for model_name, sample_id, reference, hypothesis in tasks
+        }
+    with ProcessPoolExecutor(max_workers=workers, initializer=_warm_numba) as executor:
+        return {
+            (model_name, sample_id): metrics
+            for model_name, sample_id, metrics in executor.map(_score_one, tasks, chunksize=16)
+        }
+
+
 def format_percentage(value: float) -> str:
     return f"{value * 100:.2f}%" if not math.isnan(value) else "n/d"
 
 
-def run_model_on_samples(
-    model_name: str,
-    samples: Dict[str, Sample],
-    device: str,
-    compute_type: str,
-) -> Dict[str, dict]:
+@functools.lru_cache(maxsize=4)
+def _get_wm(model_name: str, device: str, compute_type: str):
+    """Return a ``WhisperModel`` shared by every run with the same settings until :func:`_release_models`."""
+
     try:
         from faster_whisper import WhisperModel  # type: ignore
     except Exception as exc:  # pragma: no cover - fallback when package missing
         raise RuntimeError(
             "Pakiet faster-whisper nie jest dostępny. Zainstaluj zależności lub uruchom bez --run-models"
         ) from exc
+    return WhisperModel(model_name, device=device, compute_type=compute_type)
+
+
+def _release_models() -> None:
+    """Drop every cached ``WhisperModel`` so the next model loads into free (V)RAM.
+
+    ``--serve`` keeps its models; a ``--run-models`` sweep releases each one
+    before loading the next, so peak memory and ``max_vram_mib`` stay per model.
+    """
+
+    _get_wm.cache_clear()
+    gc.collect()
+    if torch is not None and torch.cuda.is_available():  # pragma: no branch - zależy od środowiska
+        torch.cuda.empty_cache()
+
+
+def _batched_pipeline_cls():
+    try:
+        from faster_whisper import BatchedInferencePipeline  # type: ignore
+    except ImportError:  # pragma: no cover - faster-whisper < 1.1
+        return None
+    return BatchedInferencePipeline
+
+
+def _transcribe_kwargs(batch_size: int) -> Dict[str, Any]:
+    """Return the ``transcribe`` options of a run, VAD always passed explicitly.
+
+    ``BatchedInferencePipeline`` chunks audio with VAD by default while
+    ``WhisperModel`` does not, which changes transcripts (and so WER and
+    runtime). Batching is used when ``batch_size > 1`` and faster-whisper
+    supports it; otherwise the sequential path runs without VAD.
+    """
+
+    if batch_size > 1 and _batched_pipeline_cls() is not None:
+        return {"batch_size": batch_size, "vad_filter": True}
+    return {"vad_filter": False}
+
+
+def _run_mode(batch_size: int) -> Dict[str, Any]:
+    """Return the ``batch_size``/``vad_filter`` pair recorded with every model in the report."""
+
+    kwargs = _transcribe_kwargs(batch_size)
+    return {"batch_size": kwargs.get("batch_size", 1), "vad_filter": kwargs["vad_filter"]}
+
+
+def _load_pipeline(model_name: str, device: str, compute_type: str, batch_size: int):
+    """Return ``(model, transcribe_kwargs)``, batching when faster-whisper supports it."""
+
+    model = _get_wm(model_name, device, compute_type)
+    kwargs = _transcribe_kwargs(batch_size)
+    if "batch_size" in kwargs:
+        return _batched_pipeline_cls()(model=model), kwargs
+    return model, kwargs
+
+
+def _decode16k(audio_path: Path) -> Any:
+    """Decode ``audio_path`` to a 16 kHz mono float32 array (PyAV via faster-whisper)."""
 
-    model = WhisperModel(model_name, device=device, compute_type=compute_type)
+    from faster_whisper import decode_audio  # type: ignore
+
+    return decode_audio(str(audio_path), sampling_rate=16000)
+
+
+def _transcribe_file(model, audio: Union[Path, Any], transcribe_kwargs: Dict[str, Any]) -> str:
+    segments, _ = model.transcribe(str(audio) if isinstance(audio, Path) else audio, **transcribe_kwargs)
+    return " ".join(segment.text.strip() for segment in segments).strip()
+
+
+def run_model_on_samples(
+    model_name: str,
+    samples: Dict[str, Sample],
+    device: str,
+    compute_type: str,
+    batch_size: int = 16,
+    use_cache: bool = False,
+    decoded_audio: Optional[Dict[str, Any]] = None,
+) -> Dict[str, dict]:
+    """Transcribe ``samples`` with one model and return per-sample run dicts.
+
+    Pass the same ``decoded_audio`` dict to every call so each file is decoded
+    once and the arrays are reused by the following models; ``runtime_s``
+    then measures transcription only.
+
+    With ``use_cache`` only transcripts are stored. Cache hits come back with
+    ``"cached": True`` and no ``runtime_s``/``max_vram_mib``, so stale timings
+    never mix with fresh ones.
+    """
+
+    if decoded_audio is None:
+        decoded_audio = {}
     results: Dict[str, dict] = {}
+    cache_keys: Dict[str, str] = {}
+    pending: Dict[str, Sample] = {}
+    for sample in samples.values():
+        if use_cache and sample.audio_path is not None:
+            key = result_cache.make_key(
+                "bench-run",
+                result_cache.file_digest(sample.audio_path),
+                model_name,
+                device,
+                compute_type,
+                batch_size,
+                result_cache.package_version("faster-whisper"),
+            )
+            cached = result_cache.get(key)
+            if cached is not None:
+                results[sample.sample_id] = {
+                    "sample_id": sample.sample_id,
+                    "transcript": cached["transcript"],
+                    "runtime_s": None,
+                    "max_vram_mib": None,
+                    "cached": True,
+                }
+                continue
+            cache_keys[sample.sample_id] = key
+        pending[sample.sample_id] = sample
+    if not pending:
+        return results
+
+    model, transcribe_kwargs = _load_pipeline(model_name, device, compute_type, batch_size)
 
     if torch is not None and torch.cuda.is_available():  # pragma: no branch - zależy od środowiska
         torch.cuda.reset_peak_memory_stats()
 
-    for sample in samples.values():
+    for sample in pending.values():
         if sample.audio_path is None:
             raise ValueError(
                 f"Próbka {sample.sample_id} nie ma przypisanej ścieżki audio. Dodaj nagranie przed --run-models"
             )
+        audio = decoded_audio.get(sample.sample_id)
+        if audio is None:
+            audio = decoded_audio[sample.sample_id] = _decode16k(sample.audio_path)
         start = time.perf_counter()
-        segments, _ = model.transcribe(str(sample.audio_path))
-        transcript = " ".join(segment.text.strip() for segment in segments).strip()
+        transcript = _transcribe_file(model, audio, transcribe_kwargs)
         runtime = time.perf_counter() - start
         max_vram = None
         if torch is not None and torch.cuda.is_available():  # pragma: no branch - zależy od środowiska
@@ -198,22 +546,87 @@ def run_model_on_samples(
             "runtime_s": runtime,
             "max_vram_mib": max_vram,
         }
-    return results
+        if sample.sample_id in cache_keys:
+            result_cache.put(cache_keys[sample.sample_id], {"transcript": transcript})
+    return {sample_id: results[sample_id] for sample_id in samples if sample_id in results}
+
+
+def serve(socket_path: Path, device: str, compute_type: str, batch_size: int) -> None:
+    """Answer transcription requests on a Unix socket, keeping models loaded.
+
+    Each connection sends JSON lines ``{"model": ..., "wav_path": ...}`` and
+    receives ``{"transcript": ..., "runtime_s": ...}`` or ``{"error": ...}``
+    per line. Requests are handled one at a time so runs never share the GPU.
+    """
+
+    if not hasattr(socketserver, "UnixStreamServer"):  # pragma: no cover - Windows
+        raise SystemExit("Tryb --serve wymaga gniazd Unix (Linux/macOS/WSL).")
+
+    class _Handler(socketserver.StreamRequestHandler):
+        def handle(self) -> None:
+            for line in self.rfile:
+                if not line.strip():
+                    continue
+                try:
+                    request = jsonio.loads(line)
+                    model, kwargs = _load_pipeline(
+                        request["model"],
+                        request.get("device", device),
+                        request.get("compute_type", compute_type),
+                        int(request.get("batch_size", batch_size)),
+                    )
+                    start = time.perf_counter()
+                    transcript = _transcribe_file(model, Path(request["wav_path"]), kwargs)
+                    response = {"transcript": transcript, "runtime_s": time.perf_counter() - start}
+                except Exception as exc:  # pragma: no cover - reported to the client
+                    response = {"error": f"{type(exc).__name__}: {exc}"}
+                self.wfile.write(jsonio.dumps(response, indent=False) + b"\n")
+
+    if socket_path.is_socket():
+        socket_path.unlink()
+    elif socket_path.exists():
+        raise SystemExit(f"{socket_path} istnieje i nie jest gniazdem Unix – nie nadpisuję go.")
+    with socketserver.UnixStreamServer(str(socket_path), _Handler) as server:
+        print(f"Nasłuchuję na {socket_path} (Ctrl+C kończy)")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            socket_path.unlink(missing_ok=True)
 
 
 def main() -> None:
     args = parse_args()
+    if args.serve:
+        serve(args.serve, args.device, args.compute_type, args.batch_size)
+        return
     samples = load_manifest(args.manifest)
 
     if args.run_models:
         print("Uruchamiam modele faster-whisper na lokalnych próbkach...")
         models_data: Dict[str, Dict[str, dict]] = {}
+        decoded_audio: Dict[str, Any] = {}
+        mode = _run_mode(args.batch_size)
         for model_name in args.models:
-            print(f"- model {model_name}")
-            runs = run_model_on_samples(model_name, samples, args.device, args.compute_type)
+            print(
+                f"- model {model_name} (batch {mode['batch_size']}, "
+                f"VAD {'tak' if mode['vad_filter'] else 'nie'})"
+            )
+            runs = run_model_on_samples(
+                model_name,
+                samples,
+                args.device,
+                args.compute_type,
+                args.batch_size,
+                use_cache=args.use_cache,
+                decoded_audio=decoded_audio,
+            )
+            _release_models()
             models_data[model_name] = {
                 "device": args.device,
                 "compute_type": args.compute_type,
+                **mode,
                 "runs": runs,
             }
     else:
@@ -232,6 +645,7 @@ def main() -> None:
     table_rows.append(" | ".join(header))
     table_rows.append(" | ".join("---" for _ in header))
 
+    scores = score_runs(models_data, samples, args.jobs)
     for model_name, data in models_data.items():
         runs = data["runs"]
         metrics_per_sample = {}
@@ -239,15 +653,14 @@ def main() -> None:
         char_values = []
         runtime_values = []
         vram_values = []
-        for sample_id, sample in samples.items():
-            run = runs.get(sample_id)
-            if not run:
-                raise KeyError(f"Brak wyników modelu {model_name} dla próbki {sample_id}")
-            metrics = compute_metrics(sample.reference_text, run["transcript"])
+        for sample_id in samples:
+            run = runs[sample_id]
+            metrics = scores[(model_name, sample_id)]
             metrics_per_sample[sample_id] = {
                 **metrics,
                 "runtime_s": run.get("runtime_s"),
                 "max_vram_mib": run.get("max_vram_mib"),
+                "cached": bool(run.get("cached")),
             }
             if not math.isnan(metrics["wer"]):
                 wer_values.append(metrics["wer"])
@@ -256,6 +669,12 @@ def main() -> None:
                 runtime_values.append(run["runtime_s"])
             if run.get("max_vram_mib") is not None:
                 vram_values.append(run["max_vram_mib"])
+            if run.get("cached"):
+                runtime_cell = "cache"
+            elif run.get("runtime_s"):
+                runtime_cell = f"{run['runtime_s']:.1f}"
+            else:
+                runtime_cell = "n/d"
             table_rows.append(
                 " | ".join(
                     [
@@ -263,7 +682,7 @@ def main() -> None:
                         sample_id,
                         format_percentage(metrics["wer"]),
                         str(metrics["char_diff"]),
-                        f"{run.get('runtime_s', 'n/d'):.1f}" if run.get("runtime_s") else "n/d",
+                        runtime_cell,
                         f"{run.get('max_vram_mib', 'n/d'):.0f}" if run.get("max_vram_mib") else "n/d",
                     ]
                 )
@@ -271,6 +690,9 @@ def main() -> None:
         report["models"][model_name] = {
             "device": data.get("device"),
             "compute_type": data.get("compute_type"),
+            # None for precomputed results that predate the field: their mode is unknown.
+            "batch_size": data.get("batch_size"),
+            "vad_filter": data.get("vad_filter"),
             "per_sample": metrics_per_sample,
             "avg_wer": statistics.mean(wer_values) if wer_values else math.nan,
             "avg_char_diff": statistics.mean(char_values) if char_values else math.nan,
@@ -278,7 +700,7 @@ def main() -> None:
             "max_vram_mib": max(vram_values) if vram_values else None,
         }
 
-    args.output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    jsonio.write(args.output, report)
     print("\nPodsumowanie:")
     print("\n".join(table_rows))
     print(f"\nZapisano metryki do {args.output}")
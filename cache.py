@@ -0,0 +1,100 @@
+"""Content-addressed on-disk cache for deterministic, expensive results."""
+
+from __future__ import annotations
+
+import contextlib
+import hashlib
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_DIR_ENV = "SKRYBSON_CACHE_DIR"
+
+_CHUNK_SIZE = 1 << 20
+_digest_memo: Dict[Tuple[str, int, int], str] = {}
+
+
+def cache_dir() -> Path:
+    """Return the cache root (``$SKRYBSON_CACHE_DIR`` or ``~/.cache/skrybson_ai``)."""
+
+    override = os.environ.get(CACHE_DIR_ENV)
+    if override:
+        return Path(override).expanduser()
+    return Path.home() / ".cache" / "skrybson_ai"
+
+
+def file_digest(path: Path) -> str:
+    """Return the SHA-256 of ``path``, streamed 1 MiB at a time.
+
+    Digests are memoised per process by ``(path, size, mtime)`` so repeated
+    lookups for an unchanged file do not re-read it.
+    """
+
+    stat = os.stat(path)
+    memo_key = (str(path), stat.st_size, stat.st_mtime_ns)
+    cached = _digest_memo.get(memo_key)
+    if cached is not None:
+        return cached
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    _digest_memo[memo_key] = value
+    return value
+
+
+def make_key(*parts: object) -> str:
+    """Build a cache key from ``parts`` (e.g. audio digest, model name, sample rate)."""
+
+    return hashlib.sha256("\x1f".join(repr(part) for part in parts).encode("utf-8")).hexdigest()
+
+
+def package_version(name: str) -> Optional[str]:
+    """Return the installed version of ``name`` (for cache keys) or ``None``."""
+
+    try:
+        from importlib.metadata import version
+
+        return version(name)
+    except Exception:
+        return None
+
+
+def _entry_path(key: str) -> Path:
+    return cache_dir() / key[:2] / f"{key}.pkl"
+
+
+def get(key: str) -> Optional[Any]:
+    """Return the payload stored under ``key`` or ``None`` when missing/unreadable."""
+
+    try:
+        with open(_entry_path(key), "rb") as handle:
+            return pickle.load(handle)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+
+
+def put(key: str, payload: Any) -> Optional[Path]:
+    """Store ``payload`` under ``key``; returns the entry path or ``None`` on I/O errors."""
+
+    path = _entry_path(key)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    except OSError:
+        return None
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump(payload, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, path)
+    except OSError:
+        with contextlib.suppress(OSError):
+            os.unlink(tmp_name)
+        return None
+    return path
+
+
+__all__ = ["CACHE_DIR_ENV", "cache_dir", "file_digest", "get", "make_key", "package_version", "put"]
@@ -1,8 +1,10 @@
 """Simple Tkinter GUI for running the transcription pipeline."""
 from __future__ import annotations
 
+import codecs
 import os
 import queue
+import selectors
 import subprocess
 import sys
 import threading
@@ -13,29 +15,49 @@ from typing import Dict, Optional
 
 
 class TranscriptionWorker(threading.Thread):
-    """Background thread that executes the transcription script."""
+    """Background thread that executes the transcription pipeline.
+
+    The pipeline runs in-process through :func:`transcribe.main_api`, so the
+    Whisper model loaded by the first run stays in memory for the next ones.
+    When ``transcribe`` cannot be imported the script is started as a
+    subprocess instead.
+    """
 
     def __init__(self, env: Dict[str, str], output_queue: "queue.Queue[str]") -> None:
         super().__init__(daemon=True)
         self._env = env
         self._output_queue = output_queue
-        self._process: Optional[subprocess.Popen[str]] = None
+        self._process: Optional[subprocess.Popen[bytes]] = None
+        self._stop_event = threading.Event()
 
     def run(self) -> None:  # pragma: no cover - Tkinter runner
+        self._output_queue.put("[info] Startuję transkrypcję...\n")
+        try:
+            import transcribe
+        except Exception as exc:
+            self._output_queue.put(f"[info] Nie mogę zaimportować transcribe ({exc}), uruchamiam podproces.\n")
+            self._run_subprocess()
+            return
+        try:
+            return_code = transcribe.main_api(self._env, self._output_queue.put, stop_event=self._stop_event)
+        except Exception as exc:  # pragma: no cover - defensive
+            self._output_queue.put(f"[error] Błąd podczas transkrypcji: {exc}\n")
+            return
+        self._output_queue.put(f"[info] Zakończono z kodem {return_code}.\n")
+
+    def _run_subprocess(self) -> None:  # pragma: no cover - Tkinter runner
         command = [sys.executable, "-u", "transcribe.py"]
         try:
-            self._output_queue.put("[info] Startuję transkrypcję...\n")
             self._process = subprocess.Popen(
                 command,
                 cwd=Path(__file__).resolve().parent,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True,
+                bufsize=0,
                 env=self._env,
             )
             assert self._process.stdout is not None
-            for line in self._process.stdout:
-                self._output_queue.put(line)
+            self._pump_output(self._process.stdout.fileno())
             return_code = self._process.wait()
             self._output_queue.put(f"[info] Zakończono z kodem {return_code}.\n")
         except FileNotFoundError as exc:
@@ -43,7 +65,43 @@ class TranscriptionWorker(threading.Thread):
         except Exception as exc:  # pragma: no cover - defensive
             self._output_queue.put(f"[error] Błąd podczas uruchomienia: {exc}\n")
 
+    def _pump_output(self, fd: int) -> None:  # pragma: no cover - Tkinter runner
+        """Forward raw output chunks as they arrive instead of waiting for full lines.
+
+        On POSIX the pipe is polled with a selector so the loop also wakes up
+        periodically; on Windows (where ``select`` does not support pipes) a
+        blocking ``os.read`` already returns whatever is available.
+        """
+
+        decoder = codecs.getincrementaldecoder("utf-8")("replace")
+
+        def _emit(data: bytes) -> None:
+            text = decoder.decode(data, final=not data)
+            if text:
+                self._output_queue.put(text.replace("\r\n", "\n"))
+
+        if os.name != "posix":
+            while data := os.read(fd, 65536):
+                _emit(data)
+            _emit(b"")
+            return
+
+        os.set_blocking(fd, False)
+        with selectors.DefaultSelector() as selector:
+            selector.register(fd, selectors.EVENT_READ)
+            while True:
+                if not selector.select(timeout=0.1):
+                    continue
+                try:
+                    data = os.read(fd, 65536)
+                except BlockingIOError:
+                    continue
+                _emit(data)
+                if not data:
+                    return
+
     def terminate(self) -> None:  # pragma: no cover - Tkinter runner
+        self._stop_event.set()
         if self._process and self._process.poll() is None:
             self._process.terminate()
 
@@ -52,6 +110,7 @@ class TranscriptionGUI(tk.Tk):  # pragma: no cover - Tkinter runner
     """Main application window."""
 
     POLL_INTERVAL_MS = 150
+    MAX_LOG_LINES = 5000
 
     def __init__(self) -> None:
         super().__init__()
@@ -207,16 +266,18 @@ class TranscriptionGUI(tk.Tk):  # pragma: no cover - Tkinter runner
         if self._worker is None:
             return
         self._worker.terminate()
-        self._queue.put("[info] Wysłano sygnał zatrzymania.\n")
+        self._queue.put("[info] Wysłano sygnał zatrzymania, przerywam po bieżącym fragmencie nagrania.\n")
 
     def _poll_output(self) -> None:
+        lines = []
         try:
             while True:
-                line = self._queue.get_nowait()
-                self._append_text(line)
+                lines.append(self._queue.get_nowait())
         except queue.Empty:
             pass
         finally:
+            if lines:
+                self._append_text("".join(lines))
             if self._worker and not self._worker.is_alive():
                 self._worker = None
                 self._start_button.configure(state=tk.NORMAL)
@@ -226,6 +287,9 @@ class TranscriptionGUI(tk.Tk):  # pragma: no cover - Tkinter runner
     def _append_text(self, text: str) -> None:
         self._text.configure(state=tk.NORMAL)
         self._text.insert(tk.END, text)
+        line_count = int(self._text.index("end-1c").split(".")[0])
+        if line_count > self.MAX_LOG_LINES:
+            self._text.delete("1.0", f"{line_count - self.MAX_LOG_LINES + 1}.0")
         self._text.see(tk.END)
         self._text.configure(state=tk.DISABLED)
 
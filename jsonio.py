@@ -0,0 +1,63 @@
+"""JSON helpers backed by orjson when it is installed."""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+from pathlib import Path
+from typing import Any, Union
+
+_MMAP_MIN_BYTES = 1 << 20
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is optional, stdlib fallback below
+    orjson = None  # type: ignore[assignment]
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Parse ``data`` (UTF-8 bytes or str)."""
+
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj: Any, *, indent: bool = True) -> bytes:
+    """Serialise ``obj`` as UTF-8 JSON, indented by two spaces unless ``indent=False``.
+
+    Non-ASCII text is written verbatim. orjson writes NaN/Infinity as ``null``
+    while the stdlib fallback keeps the (non-standard) ``NaN`` literal.
+    """
+
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def read(path: Path) -> Any:
+    """Parse the JSON file at ``path`` without decoding it to ``str`` first.
+
+    With orjson, files of 1 MiB and more are parsed straight from a read-only
+    memory map instead of being copied into a ``bytes`` object.
+    """
+
+    if orjson is None:
+        return loads(path.read_bytes())
+    with open(path, "rb") as handle:
+        if os.fstat(handle.fileno()).st_size < _MMAP_MIN_BYTES:
+            return orjson.loads(handle.read())
+        with mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            with memoryview(mapped) as view:
+                return orjson.loads(view)
+
+
+def write(path: Path, obj: Any) -> None:
+    path.write_bytes(dumps(obj))
+
+
+__all__ = ["dumps", "loads", "read", "write"]
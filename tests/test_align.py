@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import importlib
+import sys
+import types
+import wave
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Dict, Iterator, List
+
+import pytest
+
+
+def _unused(*_args: object, **_kwargs: object) -> Any:
+    raise AssertionError("the real WhisperX is not available in tests")
+
+
+@pytest.fixture(scope="module")
+def align() -> Iterator[ModuleType]:
+    """Import :mod:`align` against a stub ``whisperx``; tests patch the pieces they use."""
+
+    saved = {name: sys.modules.get(name) for name in ("whisperx", "align")}
+    sys.modules["whisperx"] = types.SimpleNamespace(  # type: ignore[assignment]
+        DiarizationPipeline=_unused,
+        load_align_model=lambda **_kwargs: (object(), {"language": "pl"}),
+        load_audio=_unused,
+        align=_unused,
+    )
+    sys.modules.pop("align", None)
+    try:
+        yield importlib.import_module("align")
+    finally:
+        for name, module in saved.items():
+            if module is None:
+                sys.modules.pop(name, None)
+            else:
+                sys.modules[name] = module
+
+
+def test_collect_words_filters_and_shifts(align: ModuleType) -> None:
+    result: Dict[str, List[Dict[str, Any]]] = {
+        "segments": [
+            {
+                "words": [
+                    {"word": " Ala ", "start": 0.5, "end": 0.75},
+                    {"word": "ma", "start": None, "end": 1.0},
+                    {"word": "kota", "start": 1.0},
+                    {"text": "psa", "start": 1.5, "end": 2.0},
+                    {"token": "i", "start": 2, "end": 2.25},
+                    {"word": "   ", "start": 2.5, "end": 3.0},
+                    {"start": 3.0, "end": 3.5},
+                ]
+            },
+            {"words": None},
+            {},
+        ]
+    }
+
+    words = align.WhisperWordAligner._collect_words(result, 10.0)
+
+    assert words == [
+        [
+            {"text": "Ala", "start": 10.5, "end": 10.75},
+            {"text": "psa", "start": 11.5, "end": 12.0},
+            {"text": "i", "start": 12.0, "end": 12.25},
+        ],
+        [],
+        [],
+    ]
+    assert all(isinstance(word["start"], float) for word in words[0])
+
+
+def _write_clicks(path: Path, rate: int, channels: int, seconds: float, clicks: List[float]) -> None:
+    np = pytest.importorskip("numpy")
+    pcm = np.zeros((int(seconds * rate), channels), dtype="<i2")
+    for t in clicks:
+        pcm[int(t * rate) : int(t * rate) + rate // 100] = 30000
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(channels)
+        handle.setsampwidth(2)
+        handle.setframerate(rate)
+        handle.writeframes(pcm.tobytes())
+
+
+def _fake_align(
+    segments: List[Dict[str, Any]], _model: object, _meta: object, audio: Any, **_kw: object
+) -> Dict[str, Any]:
+    """Put one word on the first loud sample inside each segment, in the audio's own time base."""
+
+    np = pytest.importorskip("numpy")
+    out = []
+    for seg in segments:
+        lo = max(0, int(seg["start"] * 16000))
+        loud = np.flatnonzero(np.abs(audio[lo : int(seg["end"] * 16000)]) > 0.25)
+        start = (lo + int(loud[0])) / 16000 if loud.size else seg["start"]
+        out.append({"words": [{"word": seg["text"], "start": start, "end": start + 0.1}]})
+    return {"segments": out}
+
+
+@pytest.mark.parametrize(("rate", "channels"), [(16000, 2), (48000, 2), (16000, 1)])
+def test_windowed_alignment_matches_full_decode(
+    align: ModuleType, monkeypatch: pytest.MonkeyPatch, tmp_path: Path, rate: int, channels: int
+) -> None:
+    transcribe = importlib.import_module("transcribe")
+    if rate != 16000:
+        pytest.importorskip("soxr")
+    path = tmp_path / "alice_1_seg1.wav"
+    _write_clicks(path, rate, channels, 10.0, [3.2, 7.25])
+    segments = [
+        {"start": 3.0, "end": 3.6, "text": "raz"},
+        {"start": 7.0, "end": 7.5, "text": "dwa"},
+    ]
+    header = transcribe._probe_wav(str(path), path.stat().st_size)
+    full_audio = transcribe._load_pcm16k(str(path), header)
+    monkeypatch.setattr(align, "whisperx_align", _fake_align)
+    monkeypatch.setattr(align, "load_audio", lambda _path: full_audio)
+    aligner = align.WhisperWordAligner(align.AlignerConfig(language_code="pl"))
+
+    audio, offset = align._load_audio_window(path, segments)
+    assert offset == pytest.approx(2.5)
+    assert len(audio) < len(full_audio)
+    windowed = aligner.align_words(path, segments)
+    with monkeypatch.context() as patched:
+        patched.setattr(transcribe, "_probe_wav", lambda *_args: None)
+        assert align._load_audio_window(path, segments)[1] == 0.0
+        full = aligner.align_words(path, segments)
+
+    assert [[w["text"] for w in seg] for seg in windowed] == [["raz"], ["dwa"]]
+    for win_seg, full_seg in zip(windowed, full, strict=True):
+        for win_word, full_word in zip(win_seg, full_seg, strict=True):
+            assert win_word["start"] == pytest.approx(full_word["start"], abs=2 / 16000)
+            assert win_word["end"] == pytest.approx(full_word["end"], abs=2 / 16000)
+    assert windowed[0][0]["start"] == pytest.approx(3.2, abs=2 / 16000)
+
+
+def test_align_words_batch_matches_align_words(
+    align: ModuleType, monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(align, "whisperx_align", _fake_align)
+    first, second = tmp_path / "a_seg1.wav", tmp_path / "b_seg2.wav"
+    _write_clicks(first, 16000, 2, 6.0, [1.1, 4.4])
+    _write_clicks(second, 16000, 1, 4.0, [2.0])
+    items = [
+        (first, [{"start": 1.0, "end": 1.5, "text": "raz"}, {"start": 4.0, "end": 5.0, "text": "dwa"}]),
+        (second, []),
+        (tmp_path / "missing.wav", [{"start": 0.0, "end": 1.0, "text": "nic"}]),
+        (second, [{"start": 1.5, "end": 2.5, "text": "trzy"}]),
+    ]
+    aligner = align.WhisperWordAligner(align.AlignerConfig(language_code="pl"))
+
+    batched = aligner.align_words_batch(items, max_workers=2)
+
+    assert len(batched) == len(items)
+    for (path, segments), outcome in zip(items, batched, strict=True):
+        if path.exists():
+            assert outcome == aligner.align_words(path, segments)
+        else:
+            assert isinstance(outcome, align.AlignmentError)
+            with pytest.raises(align.AlignmentError):
+                aligner.align_words(path, segments)
+    assert batched[1] == []
+    assert batched[3][0][0]["start"] == pytest.approx(2.0)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import random
+import sys
+import types
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import pytest
+
+import bench
+
+
+def _reference_distance(ref: Sequence[object], hyp: Sequence[object]) -> int:
+    """Textbook full-matrix Levenshtein distance."""
+
+    prev = list(range(len(hyp) + 1))
+    for i, ref_item in enumerate(ref, start=1):
+        curr = [i]
+        for j, hyp_item in enumerate(hyp, start=1):
+            curr.append(min(prev[j] + 1, curr[j - 1] + 1, prev[j - 1] + (ref_item != hyp_item)))
+        prev = curr
+    return prev[-1]
+
+
+@pytest.fixture(params=["default", "numpy", "python"])
+def kernel_path(request: pytest.FixtureRequest, monkeypatch: pytest.MonkeyPatch) -> str:
+    """Run the distance helpers through numba (when installed), NumPy only, and pure Python."""
+
+    if request.param == "numpy":
+        if bench.np is None:
+            pytest.skip("numpy is not installed")
+        monkeypatch.setattr(bench, "_lev_band_int", None)
+    elif request.param == "python":
+        monkeypatch.setattr(bench, "np", None)
+    return str(request.param)
+
+
+_WORD_CASES = [
+    ([], []),
+    ([], ["a", "b"]),
+    (["a", "b", "c"], []),
+    (["a", "b", "c"], ["a", "b", "c"]),
+    (["a", "b", "c"], ["a", "x", "c", "d"]),
+    # Skew of 1 but every token differs: the first band (2) is far too narrow.
+    (list("abcdefghij"), list("klmnopqrstu")),
+    # Large skew plus mismatches, so the band has to double past the skew.
+    (["a"] * 3, ["b"] * 40),
+    (list("kitten"), list("sitting")),
+]
+
+
+@pytest.mark.parametrize(("ref", "hyp"), _WORD_CASES)
+def test_token_distance_matches_reference(kernel_path: str, ref: list, hyp: list) -> None:
+    interner: Dict[str, int] = {}
+    assert bench._token_distance(ref, hyp, interner) == _reference_distance(ref, hyp)
+
+
+@pytest.mark.parametrize(
+    ("ref", "hyp"),
+    [
+        ("", ""),
+        ("", "zażółć"),
+        ("gęślą", ""),
+        ("zażółć", "zazolc"),
+        # Non-BMP code points must count as one character each, not two UTF-16 halves.
+        ("a😀b", "a😁b"),
+        ("😀😀", ""),
+        ("𝔘𝔫𝔦", "Uni"),
+    ],
+)
+def test_char_distance_matches_reference(kernel_path: str, ref: str, hyp: str) -> None:
+    assert bench._char_distance(ref, hyp) == _reference_distance(ref, hyp)
+
+
+def test_distances_match_reference_on_random_inputs(kernel_path: str) -> None:
+    rng = random.Random(1234)
+    alphabet = ["ala", "ma", "kota", "psa", "😀", "ż"]
+    interner: Dict[str, int] = {}
+    for _ in range(200):
+        ref = rng.choices(alphabet, k=rng.randint(0, 30))
+        hyp = list(ref)
+        for _edit in range(rng.randint(0, 12)):
+            pos = rng.randint(0, len(hyp))
+            roll = rng.random()
+            if roll < 0.4 or not hyp:
+                hyp.insert(pos, rng.choice(alphabet))
+            elif roll < 0.7:
+                del hyp[min(pos, len(hyp) - 1)]
+            else:
+                hyp[min(pos, len(hyp) - 1)] = rng.choice(alphabet)
+        assert bench._token_distance(ref, hyp, interner) == _reference_distance(ref, hyp)
+        ref_chars, hyp_chars = "".join(ref), "".join(hyp)
+        assert bench._char_distance(ref_chars, hyp_chars) == _reference_distance(ref_chars, hyp_chars)
+
+
+def test_scratch_buffer_grows_and_is_reused() -> None:
+    if bench.np is None:
+        pytest.skip("numpy is not installed")
+    small = bench._scratch(4)
+    big = bench._scratch(small.shape[0] * 3)
+    assert big.shape[0] >= small.shape[0] * 3
+    assert bench._scratch(4) is big
+    # A long hypothesis after a short one must not read stale rows from the grown buffer.
+    ref = ["x"] * 5000
+    hyp = ["x"] * 4999 + ["y"]
+    assert bench._token_distance(ref, hyp, {}) == 1
+
+
+def test_compute_metrics_counts() -> None:
+    metrics = bench.compute_metrics("Ala ma kota", "ala ma psa")
+    assert metrics["wer"] == pytest.approx(1 / 3)
+    assert metrics["char_diff"] == _reference_distance("alamakota", "alamapsa")
+    assert metrics["ref_word_count"] == 3
+    assert metrics["ref_char_count"] == 9
+
+
+def test_cached_runs_carry_no_timings(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    audio = tmp_path / "a.wav"
+    audio.write_bytes(b"RIFF")
+    samples = {"s1": bench.Sample("s1", "cat", "desc", "ala ma kota", audio)}
+    store: Dict[str, object] = {}
+    monkeypatch.setattr(bench.result_cache, "get", store.get)
+    monkeypatch.setattr(bench.result_cache, "put", store.__setitem__)
+    monkeypatch.setattr(bench, "_load_pipeline", lambda *args: (object(), {}))
+    monkeypatch.setattr(bench, "_decode16k", lambda path: path)
+    monkeypatch.setattr(bench, "_transcribe_file", lambda model, audio, kwargs: "ala ma kota")
+
+    fresh = bench.run_model_on_samples("tiny", samples, "cpu", "int8", use_cache=True)
+    cached = bench.run_model_on_samples("tiny", samples, "cpu", "int8", use_cache=True)
+
+    assert fresh["s1"]["runtime_s"] is not None
+    assert "cached" not in fresh["s1"]
+    assert list(store.values()) == [{"transcript": "ala ma kota"}]
+    assert cached["s1"] == {
+        "sample_id": "s1",
+        "transcript": "ala ma kota",
+        "runtime_s": None,
+        "max_vram_mib": None,
+        "cached": True,
+    }
+
+
+def test_release_models_empties_the_model_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    class _Model:
+        def __init__(self, name: str, **kwargs: object) -> None:
+            self.name = name
+
+    monkeypatch.setitem(sys.modules, "faster_whisper", types.SimpleNamespace(WhisperModel=_Model))
+    bench._get_wm.cache_clear()
+    first = bench._get_wm("small", "cpu", "int8")
+    assert bench._get_wm("small", "cpu", "int8") is first
+
+    bench._release_models()
+
+    assert bench._get_wm.cache_info().currsize == 0
+    assert bench._get_wm("small", "cpu", "int8") is not first
+    bench._get_wm.cache_clear()
+
+
+@pytest.mark.parametrize(
+    ("batch_size", "expected_kwargs", "batched"),
+    [
+        (1, {"vad_filter": False}, False),
+        (4, {"batch_size": 4, "vad_filter": True}, True),
+    ],
+)
+def test_load_pipeline_passes_vad_explicitly(
+    monkeypatch: pytest.MonkeyPatch, batch_size: int, expected_kwargs: Dict[str, object], batched: bool
+) -> None:
+    calls: List[Tuple[str, Dict[str, object]]] = []
+
+    class _Segment:
+        text = " ala ma kota "
+
+    class _Model:
+        def __init__(self, name: str, **kwargs: object) -> None:
+            pass
+
+        def transcribe(self, audio: object, **kwargs: object) -> object:
+            calls.append(("model", kwargs))
+            return [_Segment()], None
+
+    class _Pipeline:
+        def __init__(self, model: _Model) -> None:
+            self.model = model
+
+        def transcribe(self, audio: object, **kwargs: object) -> object:
+            calls.append(("pipeline", kwargs))
+            return [_Segment()], None
+
+    stub = types.SimpleNamespace(WhisperModel=_Model, BatchedInferencePipeline=_Pipeline)
+    monkeypatch.setitem(sys.modules, "faster_whisper", stub)
+    bench._get_wm.cache_clear()
+    try:
+        model, kwargs = bench._load_pipeline("small", "cpu", "int8", batch_size)
+        transcript = bench._transcribe_file(model, Path("a.wav"), kwargs)
+    finally:
+        bench._get_wm.cache_clear()
+
+    assert transcript == "ala ma kota"
+    assert calls == [("pipeline" if batched else "model", expected_kwargs)]
+    assert bench._run_mode(batch_size) == {"batch_size": batch_size, "vad_filter": batched}
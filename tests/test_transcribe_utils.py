@@ -3,68 +3,100 @@
 from __future__ import annotations
 
 import argparse
+import dataclasses
+import functools
+import importlib
+import io
+import json
 import os
+import random
+import re
 import sys
 import tempfile
-import time
+import threading
+import types
 import unittest
+import wave
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
-from typing import Optional, cast
-from unittest.mock import patch
-
-PROJECT_ROOT = Path(__file__).resolve().parents[1]
-if str(PROJECT_ROOT) not in sys.path:
-    sys.path.insert(0, str(PROJECT_ROOT))
-
-from transcribe import (
-    MockWhisperModel,
-    ModelAttempt,
-    TranscribeConfig,
-    _cli_overrides,
-    _format_timestamp,
-    _is_recoverable_model_error,
-    _parse_int,
-    _resolve_session_path,
-    _strtobool_env,
-    build_model_attempts,
-    load_config,
-    norm_text,
-    parse_args,
-    parse_iso_to_epoch,
-    pick_latest_session,
-    sanitize_text,
-    soft_merge_segments,
-    write_srt,
-    write_vtt,
-)
+from types import MappingProxyType, ModuleType
+from typing import TYPE_CHECKING, Dict, List, Mapping, Optional, Tuple, cast
+from unittest import mock
+
+import pytest
+
+if TYPE_CHECKING:  # pragma: no cover - only for type hints
+    from transcribe import MockWhisperModel, TranscribeConfig
+
+
+@functools.lru_cache(maxsize=None)
+def _tr() -> ModuleType:
+    """Import :mod:`transcribe` on first use so collection does not pay for it."""
+
+    return importlib.import_module("transcribe")
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _warm_text_helpers() -> None:
+    """Run the text helpers once so regex compilation is not charged to the first test."""
+
+    transcribe = _tr()
+    transcribe.sanitize_text("x", lower_noise=True)
+    transcribe.norm_text("x")
+
+
+@pytest.fixture(autouse=True)
+def _no_cuda(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pretend no GPU is present so results do not depend on the host."""
+
+    monkeypatch.setattr(_tr(), "_cuda_available", lambda: False)
+
+
+@pytest.fixture(autouse=True)
+def _plain_cpu(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Pretend the CPU has no bfloat16 support so CPU defaults do not depend on the host."""
+
+    monkeypatch.setattr(_tr(), "_cpu_compute_type", lambda: "int8")
+
+
+class TranscribeTestCase(unittest.TestCase):
+    """Base class exposing the lazily imported :mod:`transcribe` module as ``self._t``."""
+
+    _t: ModuleType
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls._t = _tr()
 
 
-class StrToBoolEnvTest(unittest.TestCase):
+class StrToBoolEnvTest(TranscribeTestCase):
     def test_truthy_values(self) -> None:
-        self.assertTrue(_strtobool_env("1", False))
-        self.assertTrue(_strtobool_env(" yes ", False))
+        self.assertTrue(self._t._strtobool_env("1", False))
+        self.assertTrue(self._t._strtobool_env(" yes ", False))
 
     def test_falsy_values(self) -> None:
-        self.assertFalse(_strtobool_env("0", True))
-        self.assertFalse(_strtobool_env("No", True))
+        self.assertFalse(self._t._strtobool_env("0", True))
+        self.assertFalse(self._t._strtobool_env("No", True))
 
     def test_defaults(self) -> None:
-        self.assertTrue(_strtobool_env(None, True))
-        self.assertFalse(_strtobool_env("   ", False))
+        self.assertTrue(self._t._strtobool_env(None, True))
+        self.assertFalse(self._t._strtobool_env("   ", False))
 
 
-class ParseIntTest(unittest.TestCase):
+class ParseIntTest(TranscribeTestCase):
     def test_parse_valid_int(self) -> None:
-        self.assertEqual(_parse_int("10", 5), 10)
+        self.assertEqual(self._t._parse_int("10", 5), 10)
 
     def test_parse_invalid_int(self) -> None:
-        self.assertEqual(_parse_int("foo", 5), 5)
-        self.assertEqual(_parse_int(None, 7), 7)
+        self.assertEqual(self._t._parse_int("foo", 5), 5)
+        self.assertEqual(self._t._parse_int(None, 7), 7)
 
 
-class ParseArgsTest(unittest.TestCase):
+class ParseArgsTest(TranscribeTestCase):
     def test_defaults_are_none(self) -> None:
-        parsed = parse_args([])
+        parsed = self._t.parse_args([])
 
         self.assertIsNone(parsed.recordings)
         self.assertIsNone(parsed.output)
@@ -74,13 +106,20 @@ class ParseArgsTest(unittest.TestCase):
         self.assertIsNone(parsed.model)
         self.assertIsNone(parsed.compute_type)
         self.assertIsNone(parsed.beam_size)
+        self.assertIsNone(parsed.batch_size)
+        self.assertIsNone(parsed.model_cache)
+        self.assertIsNone(parsed.num_workers)
         self.assertIsNone(parsed.language)
         self.assertIsNone(parsed.vad_filter)
         self.assertIsNone(parsed.sanitize_lower_noise)
         self.assertIsNone(parsed.align_words)
+        self.assertIsNone(parsed.dedup_strict)
+
+    def test_empty_argv_matches_parser_defaults(self) -> None:
+        self.assertEqual(vars(self._t.parse_args([])), vars(self._t._build_parser().parse_args([])))
 
     def test_all_arguments_override_defaults(self) -> None:
-        parsed = parse_args(
+        parsed = self._t.parse_args(
             [
                 "--recordings",
                 "/tmp/rec",
@@ -98,6 +137,8 @@ class ParseArgsTest(unittest.TestCase):
                 "int8",
                 "--beam-size",
                 "3",
+                "--batch-size",
+                "4",
                 "--language",
                 "en",
                 "--vad",
@@ -114,31 +155,66 @@ class ParseArgsTest(unittest.TestCase):
         self.assertEqual(parsed.model, "tiny")
         self.assertEqual(parsed.compute_type, "int8")
         self.assertEqual(parsed.beam_size, 3)
+        self.assertEqual(parsed.batch_size, 4)
         self.assertEqual(parsed.language, "en")
         self.assertTrue(parsed.vad_filter)
         self.assertTrue(parsed.sanitize_lower_noise)
         self.assertTrue(parsed.align_words)
 
     def test_negative_flags_disable_features(self) -> None:
-        parsed = parse_args(["--no-vad", "--keep-noise", "--no-align-words"])
+        parsed = self._t.parse_args(["--no-vad", "--keep-noise", "--no-align-words"])
 
         self.assertFalse(parsed.vad_filter)
         self.assertFalse(parsed.sanitize_lower_noise)
         self.assertFalse(parsed.align_words)
 
 
-class SanitizeTextTest(unittest.TestCase):
+class SanitizeTextTest(TranscribeTestCase):
     def test_basic_cleanup(self) -> None:
-        self.assertEqual(sanitize_text(" Hello   world!!! "), "Hello world!")
+        self.assertEqual(self._t.sanitize_text(" Hello   world!!! "), "Hello world!")
 
     def test_lower_noise(self) -> None:
         noisy = "Uhm... to jest, eee, test?!"
-        self.assertEqual(sanitize_text(noisy, lower_noise=True), "to jest, test?!")
-
-
-class SoftMergeSegmentsTest(unittest.TestCase):
-    def test_merge_short_segments_same_user(self) -> None:
-        segments = [
+        self.assertEqual(self._t.sanitize_text(noisy, lower_noise=True), "to jest, test?!")
+
+    def test_single_pass_matches_multi_pass_reference(self) -> None:
+        def punct(text: str) -> str:
+            text = re.sub(r"([?!.,:;])\1+", r"\1", text)
+            return re.sub(r"\s+([?!.,:;])", r"\1", text)
+
+        def reference(text: str, lower_noise: bool) -> str:
+            text = punct(re.sub(r"\s+", " ", text.strip()))
+            if lower_noise:
+                text = re.sub(r"\s{2,}", " ", self._t._NOISE_RE.sub(" ", text))
+                text = punct(text).strip()
+            return text
+
+        rng = random.Random(0)
+        alphabet = " \t\n.,!?;:abUhmeyż"
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+            for lower_noise in (False, True):
+                self.assertEqual(
+                    self._t.sanitize_text(text, lower_noise=lower_noise),
+                    reference(text, lower_noise),
+                    repr(text),
+                )
+
+    def test_batch_matches_single(self) -> None:
+        texts = [" Hello   world!!! ", "Uhm... to jest, eee, test?!", "  ", "a\t\tb ,, c"]
+        for lower_noise in (False, True):
+            self.assertEqual(
+                self._t.sanitize_texts(texts, lower_noise=lower_noise),
+                [self._t.sanitize_text(text, lower_noise=lower_noise) for text in texts],
+            )
+
+
+@pytest.fixture(scope="module")
+def merge_segments() -> Tuple[Mapping[str, object], ...]:
+    """Read-only segments shared by the soft-merge cases."""
+
+    return (
+        MappingProxyType(
             {
                 "start": 0.0,
                 "end": 0.4,
@@ -146,7 +222,9 @@ class SoftMergeSegmentsTest(unittest.TestCase):
                 "user": "alice",
                 "files": ["a.wav"],
                 "words": [{"text": "Cześć", "start": 0.0, "end": 0.4}],
-            },
+            }
+        ),
+        MappingProxyType(
             {
                 "start": 0.45,
                 "end": 0.9,
@@ -154,75 +232,172 @@ class SoftMergeSegmentsTest(unittest.TestCase):
                 "user": "alice",
                 "files": ["b.wav"],
                 "words": [{"text": "hej", "start": 0.45, "end": 0.9}],
-            },
-            {"start": 2.0, "end": 3.0, "text": "co tam", "user": "bob"},
-        ]
-
-        merged = soft_merge_segments(
-            segments,
-            user_key="user",
-            max_gap=0.6,
-            short_threshold=1.0,
-            lower_noise=True,
-        )
+            }
+        ),
+        MappingProxyType({"start": 2.0, "end": 3.0, "text": "co tam", "user": "bob"}),
+    )
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "expected_len", "expected_text"),
+    [
+        pytest.param(
+            {"user_key": "user", "max_gap": 0.6, "short_threshold": 1.0, "lower_noise": True},
+            2,
+            "Cześć hej",
+            id="same-user",
+        ),
+        pytest.param({}, 2, "Cześć hej", id="defaults"),
+        pytest.param({"user_key": "user", "max_gap": 0.01}, 3, "Cześć", id="gap-too-wide"),
+        pytest.param({"short_threshold": 0.1}, 3, "Cześć", id="segments-not-short"),
+    ],
+)
+def test_soft_merge_segments(
+    merge_segments: Tuple[Mapping[str, object], ...],
+    kwargs: Dict[str, object],
+    expected_len: int,
+    expected_text: str,
+) -> None:
+    merged = _tr().soft_merge_segments(list(merge_segments), **kwargs)
+
+    assert len(merged) == expected_len
+    first = merged[0]
+    assert first["text"] == expected_text
+    if expected_len == 2:
+        assert first["files"] == ["a.wav", "b.wav"]
+        assert len(cast(list, first.get("words", []))) == 2
+
+
+@pytest.fixture(scope="module", params=[10, 1000], ids=lambda n: f"n={n}")
+def bulk_segments(request: pytest.FixtureRequest) -> List[Dict[str, object]]:
+    """Back-to-back short segments alternating between two speakers."""
+
+    n = request.param
+    return [
+        {
+            "start": i * 0.5,
+            "end": i * 0.5 + 0.4,
+            "text": f"w{i}",
+            "user": "alice" if i % 2 else "bob",
+            "files": [f"{i}.wav"],
+        }
+        for i in range(n)
+    ]
 
-        self.assertEqual(len(merged), 2)
-        first = merged[0]
-        self.assertEqual(first["text"], "Cześć hej")
-        self.assertEqual(first["files"], ["a.wav", "b.wav"])
-        words = cast(list, first.get("words", []))
-        self.assertEqual(len(words), 2)
 
-    def test_empty_input(self) -> None:
-        self.assertEqual(soft_merge_segments([]), [])
+def test_soft_merge_scales(bulk_segments: List[Dict[str, object]]) -> None:
+    merged_all = _tr().soft_merge_segments(bulk_segments)
+    merged_by_user = _tr().soft_merge_segments(bulk_segments, user_key="user")
 
+    assert len(merged_all) == 1
+    assert len(cast(list, merged_all[0]["files"])) == len(bulk_segments)
+    assert len(merged_by_user) == len(bulk_segments)
 
-class NormalisationHelpersTest(unittest.TestCase):
+
+def test_soft_merge_segments_empty_input() -> None:
+    assert _tr().soft_merge_segments([]) == []
+
+
+@pytest.mark.parametrize(("strict", "expected"), [(False, ["Tak", "Nie", "tak!"]), (True, ["Tak", "Nie"])])
+def test_dedup_timeline(strict: bool, expected: List[str]) -> None:
+    items: List[Dict[str, object]] = [
+        {"text": "Tak", "pseudo_t": 0.0},
+        {"text": "Nie", "pseudo_t": 0.5},
+        {"text": "tak!", "pseudo_t": 1.0},
+        {"text": "Nie", "pseudo_t": 3.0},
+    ]
+
+    kept, dropped = _tr().dedup_timeline(items, strict=strict)
+
+    assert [item["text"] for item in kept] == [*expected, "Nie"]
+    assert len(kept) + len(dropped) == len(items)
+
+
+class NormalisationHelpersTest(TranscribeTestCase):
     def test_norm_text(self) -> None:
-        self.assertEqual(norm_text("  Héllo, Wórld!  "), "héllo wórld")
+        self.assertEqual(self._t.norm_text("  Héllo, Wórld!  "), "héllo wórld")
+        self.assertEqual(self._t.norm_text("Zażółć\tgęślą  jaźń — snake_case"), "zażółćgęślą jaźń snake_case")
+
+    def test_norm_text_matches_regex_reference(self) -> None:
+        def reference(text: str) -> str:
+            text = re.sub(r"[^\wąćęłńóśżź ]+", "", text.strip().lower())
+            return re.sub(r"\s+", " ", text)
+
+        rng = random.Random(0)
+        alphabet = "aZąĆęŁńÓśŻź 09_\t\n.,!?-—ß½İΣ\u00a0\u2028"
+        for _ in range(2000):
+            text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 16)))
+            self.assertEqual(self._t.norm_text(text), reference(text), repr(text))
+
+    def test_iso_z_matches_datetime(self) -> None:
+        for epoch in (0.0, 1_700_000_000.0, 1_700_000_000.25, 1_700_000_000.9999996, 1_700_086_399.5):
+            expected = datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat().replace("+00:00", "Z")
+            self.assertEqual(self._t._iso_z(epoch), expected)
 
     def test_parse_iso_to_epoch(self) -> None:
         iso_value = "2024-01-01T12:00:00Z"
-        epoch = parse_iso_to_epoch(iso_value)
+        epoch = self._t.parse_iso_to_epoch(iso_value)
         self.assertIsInstance(epoch, float)
-        self.assertEqual(parse_iso_to_epoch(""), None)
-        self.assertEqual(parse_iso_to_epoch("not-a-date"), None)
+        self.assertEqual(self._t.parse_iso_to_epoch(""), None)
+        self.assertEqual(self._t.parse_iso_to_epoch("not-a-date"), None)
 
 
-class TimestampFormattingTest(unittest.TestCase):
-    def test_format_timestamp_vtt(self) -> None:
-        self.assertEqual(_format_timestamp(1.234, separator="."), "00:00:01.234")
+@pytest.mark.parametrize(
+    ("prefix", "expected"),
+    [
+        ("alice_123456", "user_123456"),
+        ("Zoë  (mod)", "user_Zo_mod"),
+        ("???", "user_???"),
+    ],
+)
+def test_user_file_stub(prefix: str, expected: str) -> None:
+    assert _tr()._user_file_stub(prefix) == expected
 
-    def test_format_timestamp_srt(self) -> None:
-        self.assertEqual(_format_timestamp(3661.2, separator=","), "01:01:01,200")
 
+def test_log_detail_follows_log_level(
+    monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+    monkeypatch.delenv("LOG_LEVEL", raising=False)
+    assert _tr()._log_segments()
+    monkeypatch.setenv("LOG_LEVEL", " DEBUG ")
+    assert _tr()._log_segments()
+    monkeypatch.setenv("LOG_LEVEL", "info")
+    assert not _tr()._log_segments()
 
-class PickLatestSessionTest(unittest.TestCase):
-    def test_pick_latest(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            base = Path(tmpdir)
-            first = base / "session1"
-            second = base / "session2"
-            first.mkdir()
-            second.mkdir()
+    _tr().NarrativeLogger(verbose=False).log_detail("Segment", {"tekst": "cisza"})
+    assert capsys.readouterr().out == ""
+    _tr().NarrativeLogger(verbose=True).log_detail("Segment", {"tekst": "głos"})
+    assert "tekst: głos" in capsys.readouterr().out
 
-            # Ensure the second directory has a newer mtime
-            time.sleep(0.01)
-            os.utime(second, None)
 
-            self.assertEqual(pick_latest_session(base), second)
+class TimestampFormattingTest(TranscribeTestCase):
+    def test_format_timestamp_vtt(self) -> None:
+        self.assertEqual(self._t._format_timestamp(1.234, separator="."), "00:00:01.234")
+
+    def test_format_timestamp_srt(self) -> None:
+        self.assertEqual(self._t._format_timestamp(3661.2, separator=","), "01:01:01,200")
 
+    def test_format_timestamp_carries_and_clamps(self) -> None:
+        self.assertEqual(self._t._format_timestamp(59.9996, separator=","), "00:01:00,000")
+        self.assertEqual(self._t._format_timestamp(-0.25, separator="."), "00:00:00.000")
 
-class BuildModelAttemptsTest(unittest.TestCase):
-    def test_cuda_attempts_include_fallbacks(self) -> None:
-        cfg = TranscribeConfig(
+
+class BuildModelAttemptsTest(TranscribeTestCase):
+    def setUp(self) -> None:
+        for name in ("_cuda_available", "_cuda_int8_supported"):
+            patcher = mock.patch.object(self._t, name, return_value=True)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _cuda_config(self, compute_type: str) -> TranscribeConfig:
+        config: TranscribeConfig = self._t.TranscribeConfig(
             recordings_dir=Path("/tmp/rec"),
             output_dir=Path("/tmp/out"),
             session_dir=None,
             requested_device="cuda",
             model_size="large-v3",
             device="cuda",
-            compute_type="int8_float16",
+            compute_type=compute_type,
             beam_size=5,
             language="pl",
             vad_filter=True,
@@ -232,201 +407,483 @@ class BuildModelAttemptsTest(unittest.TestCase):
             profile="quality@cuda",
             mock_transcriber=False,
         )
+        return config
 
-        attempts = build_model_attempts(cfg)
+    def test_cuda_attempts_include_fallbacks(self) -> None:
+        attempts = self._t.build_model_attempts(self._cuda_config("int8_float16"))
 
         self.assertEqual(
             attempts[0],
-            ModelAttempt("cuda", "large-v3", "int8_float16", "konfiguracja bazowa"),
+            self._t.ModelAttempt("cuda", "large-v3", "int8_float16", "konfiguracja bazowa"),
         )
         self.assertIn(
-            ModelAttempt("cuda", "large-v3", "int8", "cuda: wymuszam int8 po OOM"),
+            self._t.ModelAttempt("cuda", "large-v3", "int8", "cuda: wymuszam int8 po OOM"),
             attempts,
         )
         self.assertIn(
-            ModelAttempt("cpu", "medium", "int8", "CPU fallback polityki"),
+            self._t.ModelAttempt("cpu", "medium", "int8", "CPU fallback polityki"),
             attempts,
         )
 
+    def test_auto_compute_skips_int8_ladder(self) -> None:
+        attempts = self._t.build_model_attempts(self._cuda_config("auto"))
 
-class LoadConfigProfileTest(unittest.TestCase):
-    def test_ci_mock_profile(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            recordings_dir = Path(tmpdir) / "recordings"
-            output_dir = Path(tmpdir) / "out"
-            recordings_dir.mkdir()
-            output_dir.mkdir()
-            with patch.dict(
-                os.environ,
-                {
-                    "RECORDINGS_DIR": str(recordings_dir),
-                    "OUTPUT_DIR": str(output_dir),
-                    "WHISPER_PROFILE": "ci-mock",
-                },
-                clear=True,
-            ):
-                config = load_config(None)
-
-        self.assertEqual(config.profile, "ci-mock")
-        self.assertTrue(config.mock_transcriber)
-        self.assertEqual(config.device, "cpu")
-        self.assertEqual(config.model_size, "tiny")
-        self.assertEqual(config.compute_type, "int8")
-        self.assertEqual(config.beam_size, 1)
-        self.assertEqual(config.language, "pl")
-
-
-class LoadConfigFallbackTest(unittest.TestCase):
-    def test_cuda_fallback_to_cpu_defaults(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            recordings_dir = Path(tmpdir) / "recordings"
-            output_dir = Path(tmpdir) / "out"
-            recordings_dir.mkdir()
-            output_dir.mkdir()
-
-            with patch.dict(
-                os.environ,
-                {
-                    "RECORDINGS_DIR": str(recordings_dir),
-                    "OUTPUT_DIR": str(output_dir),
-                    "WHISPER_DEVICE": "cuda",
-                },
-                clear=True,
-            ):
-                with patch("transcribe._cuda_available", return_value=False):
-                    config = load_config(None)
-
-        self.assertEqual(config.requested_device, "cuda")
-        self.assertEqual(config.device, "cpu")
-        self.assertEqual(config.model_size, "medium")
-        self.assertEqual(config.compute_type, "int8")
-
-
-class MockWhisperModelTest(unittest.TestCase):
-    def test_mock_transcribe_returns_placeholder(self) -> None:
-        model = MockWhisperModel(language="pl")
-        segments, info = model.transcribe("foo/bar.wav")
-
-        self.assertEqual(len(segments), 1)
-        self.assertTrue(segments[0].text.startswith("[mock:pl]"))
-        self.assertEqual(info["language"], "pl")
-
-
-class CliHelpersTest(unittest.TestCase):
-    def test_cli_overrides_detects_any_override(self) -> None:
-        args = argparse.Namespace(
-            recordings=Path("/tmp/rec"),
-            output=None,
-            session=None,
-            profile=None,
-            device=None,
-            model=None,
-            compute_type=None,
-            beam_size=None,
-            language=None,
-            vad_filter=None,
-            sanitize_lower_noise=None,
-            align_words=None,
-        )
-        self.assertTrue(_cli_overrides(args))
-
-        none_args = argparse.Namespace(
-            recordings=None,
-            output=None,
-            session=None,
-            profile=None,
-            device=None,
-            model=None,
-            compute_type=None,
-            beam_size=None,
-            language=None,
-            vad_filter=None,
-            sanitize_lower_noise=None,
-            align_words=None,
+        self.assertEqual(
+            [(a.device, a.model_size, a.compute_type) for a in attempts if a.device == "cuda"],
+            [("cuda", "large-v3", "auto"), ("cuda", "medium", "auto")],
         )
-        self.assertFalse(_cli_overrides(none_args))
-
-
-class SessionResolutionTest(unittest.TestCase):
-    def _make_config(self, recordings_dir: Path, session_dir: Optional[Path]) -> TranscribeConfig:
-        return TranscribeConfig(
-            recordings_dir=recordings_dir,
-            output_dir=recordings_dir / "out",
-            session_dir=session_dir,
-            requested_device="cpu",
-            model_size="small",
-            device="cpu",
-            compute_type="int8",
-            beam_size=1,
-            language="pl",
-            vad_filter=False,
-            vad_parameters={},
-            sanitize_lower_noise=False,
-            align_words=False,
-            profile=None,
-            mock_transcriber=False,
+
+    def test_cuda_fallbacks_skipped_without_gpu(self) -> None:
+        with mock.patch.object(self._t, "_cuda_available", return_value=False):
+            attempts = self._t.build_model_attempts(self._cuda_config("int8_float16"))
+
+        self.assertEqual([a.device for a in attempts], ["cuda", "cpu", "cpu"])
+
+    def test_gpu_without_int8_uses_float_variants(self) -> None:
+        with mock.patch.object(self._t, "_cuda_int8_supported", return_value=False):
+            attempts = self._t.build_model_attempts(self._cuda_config("int8_float16"))
+
+        self.assertEqual(
+            [(a.model_size, a.compute_type) for a in attempts if a.device == "cuda"],
+            [("large-v3", "float16"), ("medium", "bfloat16")],
         )
 
-    def test_resolve_prefers_explicit_path(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            recordings_dir = Path(tmpdir) / "rec"
-            recordings_dir.mkdir()
-            explicit = recordings_dir / "sessionA"
-            explicit.mkdir()
+    def test_batched_pipeline_is_per_thread_over_one_model(self) -> None:
+        config = self._cuda_config("int8_float16")
+        config.batch_size = 8
+        config.num_workers = 2
+
+        class _Model:
+            def __init__(self, *_args: object, **_kwargs: object) -> None:
+                pass
+
+        class _Pipeline:
+            created: List["_Pipeline"] = []
+
+            def __init__(self, model: object) -> None:
+                self.model = model
+                _Pipeline.created.append(self)
+
+            def transcribe(self, audio: object, **kwargs: object) -> object:
+                return self, kwargs
+
+        with (
+            mock.patch.object(self._t, "_RuntimeBatchedPipeline", _Pipeline),
+            mock.patch.dict(self._t._model_cache, clear=True),
+        ):
+            loaded = self._t.load_whisper_model(config, self._t.NarrativeLogger(stream=io.StringIO()), _Model)
+            first, kwargs = loaded.transcribe("a.wav", batch_size=8)
+            again, _ = loaded.transcribe("b.wav")
+            with ThreadPoolExecutor(max_workers=1) as pool:
+                other, _ = pool.submit(loaded.transcribe, "c.wav").result()
+
+        self.assertIs(first, again)
+        self.assertIsNot(first, other)
+        self.assertEqual(kwargs, {"batch_size": 8})
+        self.assertEqual(len(_Pipeline.created), 2)
+        self.assertIs(first.model, other.model)
+
+
+@pytest.mark.parametrize(
+    ("compute_type", "with_cache", "expected"),
+    [
+        pytest.param("int8", True, True, id="converted"),
+        pytest.param("float16", True, False, id="not-quantised"),
+        pytest.param("int8", False, False, id="no-cache-dir"),
+    ],
+)
+def test_converted_model_path_reuses_cache(
+    tmp_path: Path, compute_type: str, with_cache: bool, expected: bool
+) -> None:
+    target = tmp_path / f"large-v3-{compute_type}"
+    target.mkdir()
+    (target / "model.bin").write_bytes(b"")
+
+    path = _tr()._converted_model_path(
+        "large-v3", compute_type, tmp_path if with_cache else None, _tr().NarrativeLogger()
+    )
+
+    assert path == (target if expected else None)
+
+
+@pytest.fixture(scope="module")
+def mock_model() -> MockWhisperModel:
+    """One mock model shared by the module, mirroring the load-once model cache."""
+
+    model: MockWhisperModel = _tr().MockWhisperModel(language="pl")
+    return model
+
+
+def test_mock_transcribe_returns_placeholder(mock_model: MockWhisperModel) -> None:
+    segments, info = mock_model.transcribe("foo/bar.wav")
+
+    assert len(segments) == 1
+    assert segments[0].text.startswith("[mock:pl]")
+    assert info["language"] == "pl"
+
+
+_CLI_NAMESPACE_BASE = dict.fromkeys(
+    (
+        "recordings",
+        "output",
+        "session",
+        "profile",
+        "device",
+        "model",
+        "compute_type",
+        "beam_size",
+        "batch_size",
+        "model_cache",
+        "num_workers",
+        "language",
+        "vad_filter",
+        "sanitize_lower_noise",
+        "align_words",
+        "dedup_strict",
+    )
+)
 
-            config = self._make_config(recordings_dir, explicit)
-            resolved = _resolve_session_path(config)
 
-        self.assertEqual(resolved, explicit.resolve())
+@pytest.mark.parametrize(
+    ("override", "expected"),
+    [
+        pytest.param({"recordings": Path("/tmp/rec")}, True, id="one-set"),
+        pytest.param({}, False, id="all-none"),
+    ],
+)
+def test_cli_overrides_detects_any_override(override: Dict[str, object], expected: bool) -> None:
+    args = argparse.Namespace(**{**_CLI_NAMESPACE_BASE, **override})
 
-    def test_resolve_falls_back_to_latest(self) -> None:
-        with tempfile.TemporaryDirectory() as tmpdir:
-            recordings_dir = Path(tmpdir) / "rec"
-            recordings_dir.mkdir()
-            first = recordings_dir / "session1"
-            second = recordings_dir / "session2"
-            first.mkdir()
-            second.mkdir()
-            time.sleep(0.01)
-            os.utime(second, None)
+    assert _tr()._cli_overrides(args) is expected
 
-            config = self._make_config(recordings_dir, None)
-            resolved = _resolve_session_path(config)
 
-        self.assertEqual(resolved, second.resolve())
+@pytest.fixture(scope="module")
+def recordings_tree(tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Shared ``recordings/{session1,session2}`` + ``out`` tree, built once per module.
 
+    ``session2`` is the most recently modified session. Tests must not change
+    the layout; they may only add files of their own under ``out``.
+    """
 
-class TimestampWritersTest(unittest.TestCase):
-    def test_write_srt_and_vtt_outputs(self) -> None:
-        segments = [
-            {"start": 0.0, "end": 1.0, "text": "Hello"},
-            {"start": 1.5, "end": 3.0, "text": "World"},
-        ]
+    root = tmp_path_factory.mktemp("tree")
+    recordings_dir = root / "recordings"
+    (recordings_dir / "session1").mkdir(parents=True)
+    (recordings_dir / "session2").mkdir()
+    (root / "out").mkdir()
+    # Explicit mtimes keep the ordering independent of clock/filesystem resolution.
+    os.utime(recordings_dir / "session1", (1000.0, 1000.0))
+    os.utime(recordings_dir / "session2", (2000.0, 2000.0))
+    return root
+
+
+def _make_config(recordings_dir: Path, session_dir: Optional[Path]) -> TranscribeConfig:
+    config: TranscribeConfig = _tr().TranscribeConfig(
+        recordings_dir=recordings_dir,
+        output_dir=recordings_dir / "out",
+        session_dir=session_dir,
+        requested_device="cpu",
+        model_size="small",
+        device="cpu",
+        compute_type="int8",
+        beam_size=1,
+        language="pl",
+        vad_filter=False,
+        vad_parameters={},
+        sanitize_lower_noise=False,
+        align_words=False,
+        profile=None,
+        mock_transcriber=False,
+    )
+    return config
+
+
+def test_pick_latest_session(recordings_tree: Path) -> None:
+    recordings_dir = recordings_tree / "recordings"
+
+    assert _tr().pick_latest_session(recordings_dir) == recordings_dir / "session2"
+    assert _tr().pick_latest_session(recordings_tree / "missing") is None
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            base = Path(tmpdir)
-            srt_path = base / "out.srt"
-            vtt_path = base / "out.vtt"
 
-            write_srt(segments, srt_path)
-            write_vtt(segments, vtt_path, base=0.5)
+def test_resolve_session_prefers_explicit_path(recordings_tree: Path) -> None:
+    recordings_dir = recordings_tree / "recordings"
+    explicit = recordings_dir / "session1"
 
-            srt_content = srt_path.read_text(encoding="utf-8").splitlines()
-            vtt_content = vtt_path.read_text(encoding="utf-8").splitlines()
+    resolved = _tr()._resolve_session_path(_make_config(recordings_dir, explicit))
 
-        self.assertEqual(srt_content[0], "1")
-        self.assertEqual(srt_content[1], "00:00:00,000 --> 00:00:01,000")
-        self.assertEqual(vtt_content[0], "WEBVTT")
-        self.assertIn("00:00:01.000 --> 00:00:02.500", vtt_content)
+    assert resolved == explicit.resolve()
 
 
-class RecoverableErrorsTest(unittest.TestCase):
+def test_resolve_session_falls_back_to_latest(recordings_tree: Path) -> None:
+    recordings_dir = recordings_tree / "recordings"
+
+    resolved = _tr()._resolve_session_path(_make_config(recordings_dir, None))
+
+    assert resolved == (recordings_dir / "session2").resolve()
+
+
+_CONFIG_ENV_KEYS = ("RECORDINGS_DIR", "OUTPUT_DIR", "SESSION_DIR", "SANITIZE_LOWER_NOISE")
+
+
+@pytest.fixture
+def config_env(monkeypatch: pytest.MonkeyPatch, recordings_tree: Path) -> pytest.MonkeyPatch:
+    """Drop every variable ``load_config`` reads and point it at ``recordings_tree``."""
+
+    for key in (*_CONFIG_ENV_KEYS, *(key for key in os.environ if key.startswith("WHISPER_"))):
+        monkeypatch.delenv(key, raising=False)
+    monkeypatch.setenv("RECORDINGS_DIR", str(recordings_tree / "recordings"))
+    monkeypatch.setenv("OUTPUT_DIR", str(recordings_tree / "out"))
+    return monkeypatch
+
+
+def test_load_config_ci_mock_profile(config_env: pytest.MonkeyPatch) -> None:
+    config_env.setenv("WHISPER_PROFILE", "ci-mock")
+
+    config = _tr().load_config(None)
+
+    assert config.profile == "ci-mock"
+    assert config.mock_transcriber
+    assert config.device == "cpu"
+    assert config.model_size == "tiny"
+    assert config.compute_type == "int8"
+    assert config.beam_size == 1
+    assert config.language == "pl"
+
+
+def test_load_config_cuda_fallback_to_cpu_defaults(config_env: pytest.MonkeyPatch) -> None:
+    config_env.setenv("WHISPER_DEVICE", "cuda")
+
+    config = _tr().load_config(None)
+
+    assert config.requested_device == "cuda"
+    assert config.device == "cpu"
+    assert config.model_size == "medium"
+    assert config.compute_type == "int8"
+
+
+@pytest.mark.parametrize(("device", "expected"), [("cuda", "float16"), ("cpu", "float32")])
+def test_load_config_float32_downshifts_on_gpu(
+    config_env: pytest.MonkeyPatch, device: str, expected: str
+) -> None:
+    config_env.setattr(_tr(), "_cuda_available", lambda: True)
+    config_env.setenv("WHISPER_DEVICE", device)
+    config_env.setenv("WHISPER_COMPUTE", "float32")
+
+    assert _tr().load_config(None).compute_type == expected
+
+
+def test_load_config_prefers_bf16_cpu_compute(config_env: pytest.MonkeyPatch) -> None:
+    config_env.setattr(_tr(), "_cpu_compute_type", lambda: "int8_bfloat16")
+    config_env.setenv("WHISPER_DEVICE", "cpu")
+
+    assert _tr().load_config(None).compute_type == "int8_bfloat16"
+
+
+def test_load_config_batch_size(config_env: pytest.MonkeyPatch) -> None:
+    assert _tr().load_config(None).batch_size == 1
+
+    config_env.setenv("WHISPER_BATCH_SIZE", "16")
+    assert _tr().load_config(None).batch_size == 16
+    assert _tr().load_config(_tr().parse_args(["--batch-size", "0"])).batch_size == 1
+
+
+def test_load_config_num_workers(config_env: pytest.MonkeyPatch) -> None:
+    config_env.setenv("WHISPER_NUM_WORKERS", "3")
+    assert _tr().load_config(None).num_workers == 3
+    assert _tr().load_config(_tr().parse_args(["--num-workers", "0"])).num_workers == 1
+
+
+def test_load_config_defers_output_resolve(config_env: pytest.MonkeyPatch) -> None:
+    config_env.setenv("OUTPUT_DIR", "relative/out")
+
+    config = _tr().load_config(None)
+
+    assert config.output_dir == Path("relative/out")
+    assert config.recordings_dir.is_absolute()
+
+
+def _write_wav(path: Path, seconds: float) -> None:
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(16000)
+        handle.writeframes(b"\x00\x00" * int(16000 * seconds))
+
+
+def test_probe_wav_reads_declared_duration(tmp_path: Path) -> None:
+    full = tmp_path / "full.wav"
+    _write_wav(full, 1.0)
+    garbage = tmp_path / "garbage.wav"
+    garbage.write_bytes(b"\x00" * 4096)
+
+    header = _tr()._probe_wav(str(full), full.stat().st_size)
+
+    assert header.duration == pytest.approx(1.0)
+    assert (header.sample_rate, header.channels, header.bits_per_sample, header.data_offset) == (16000, 1, 16, 44)
+    assert _tr()._probe_wav(str(garbage), 4096) is None
+
+
+def test_probe_wav_clamps_truncated_data(tmp_path: Path) -> None:
+    path = tmp_path / "truncated.wav"
+    _write_wav(path, 1.0)
+    with path.open("r+b") as handle:
+        handle.truncate(44 + 8000)
+
+    assert _tr()._probe_wav(str(path), 44 + 8000).duration == pytest.approx(0.25)
+
+
+def test_load_pcm16k_maps_samples(tmp_path: Path) -> None:
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "pcm.wav"
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(1)
+        handle.setsampwidth(2)
+        handle.setframerate(16000)
+        handle.writeframes(np.array([0, 16384, -32768], dtype="<i2").tobytes() * 6000)
+    header = _tr()._probe_wav(str(path), path.stat().st_size)
+
+    audio = _tr()._load_pcm16k(str(path), header)
+
+    assert audio.dtype == np.float32
+    assert audio[:3].tolist() == [0.0, 0.5, -1.0]
+    assert _tr()._load_pcm16k(str(path), dataclasses.replace(header, bits_per_sample=24)) is None
+
+
+def test_load_pcm16k_downmixes_stereo(tmp_path: Path) -> None:
+    np = pytest.importorskip("numpy")
+    path = tmp_path / "stereo.wav"
+    with wave.open(str(path), "wb") as handle:
+        handle.setnchannels(2)
+        handle.setsampwidth(2)
+        handle.setframerate(16000)
+        handle.writeframes(np.array([16384, 0, -32768, 0], dtype="<i2").tobytes() * 4000)
+    header = _tr()._probe_wav(str(path), path.stat().st_size)
+
+    audio = _tr()._load_pcm16k(str(path), header)
+
+    assert audio.shape == (8000,)
+    assert audio[:2].tolist() == [0.25, -0.5]
+
+
+def test_write_srt_and_vtt_outputs(recordings_tree: Path) -> None:
+    segments = [
+        {"start": 0.0, "end": 1.0, "text": "Hello"},
+        {"start": 1.5, "end": 3.0, "text": "World"},
+    ]
+    srt_path = recordings_tree / "out" / "writers.srt"
+    vtt_path = recordings_tree / "out" / "writers.vtt"
+
+    _tr().write_srt(segments, srt_path)
+    _tr().write_vtt(segments, vtt_path, base=0.5)
+
+    with srt_path.open(encoding="utf-8") as handle:
+        assert [next(handle).rstrip("\n") for _ in range(2)] == ["1", "00:00:00,000 --> 00:00:01,000"]
+    with vtt_path.open(encoding="utf-8") as handle:
+        assert next(handle).rstrip("\n") == "WEBVTT"
+        assert any(line.rstrip("\n") == "00:00:01.000 --> 00:00:02.500" for line in handle)
+
+
+class RecoverableErrorsTest(TranscribeTestCase):
     def test_memory_errors_are_recoverable(self) -> None:
-        self.assertTrue(_is_recoverable_model_error(MemoryError()))
+        self.assertTrue(self._t._is_recoverable_model_error(MemoryError()))
         oom = RuntimeError("CUDA out of memory while loading model")
-        self.assertTrue(_is_recoverable_model_error(oom))
+        self.assertTrue(self._t._is_recoverable_model_error(oom))
         other = RuntimeError("network unavailable")
-        self.assertFalse(_is_recoverable_model_error(other))
+        self.assertFalse(self._t._is_recoverable_model_error(other))
+
+
+class MainApiTest(TranscribeTestCase):
+    @staticmethod
+    def _session_env(tmpdir: str) -> Dict[str, str]:
+        raw_dir = Path(tmpdir) / "recordings" / "session-a" / "raw"
+        raw_dir.mkdir(parents=True)
+        with wave.open(str(raw_dir / "alice_1_seg1.wav"), "wb") as handle:
+            handle.setnchannels(1)
+            handle.setsampwidth(2)
+            handle.setframerate(16000)
+            handle.writeframes(b"\x00\x00" * 16000)
+        return {
+            "RECORDINGS_DIR": str(Path(tmpdir) / "recordings"),
+            "OUTPUT_DIR": str(Path(tmpdir) / "out"),
+            "WHISPER_PROFILE": "ci-mock",
+        }
+
+    def test_mock_profile_run_writes_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = self._session_env(tmpdir)
+            logs: list[str] = []
+
+            code = self._t.main_api(env, logs.append)
+
+            transcripts = Path(env["OUTPUT_DIR"]) / "session-a" / "transcripts"
+            self.assertEqual(code, 0)
+            self.assertTrue((transcripts / "user_1.json").exists())
+            self.assertTrue((transcripts / "conversation.json").exists())
+            self.assertIn("[mock:pl] alice_1_seg1", "".join(logs))
+
+    def test_run_leaves_process_environment_and_streams_alone(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = self._session_env(tmpdir)
+            seen: list[object] = []
+            mock_transcribe = self._t.MockWhisperModel.transcribe
+
+            def _transcribe_and_look(model: object, audio: str, **kwargs: object) -> object:
+                seen.extend([os.environ.get("RECORDINGS_DIR"), sys.stdout, sys.stderr])
+                return mock_transcribe(model, audio, **kwargs)
+
+            with mock.patch.dict(os.environ, {"RECORDINGS_DIR": "/nonexistent"}):
+                with mock.patch.object(self._t.MockWhisperModel, "transcribe", _transcribe_and_look):
+                    code = self._t.main_api(env, lambda _line: None)
+
+            self.assertEqual(code, 0)
+            self.assertEqual(seen, ["/nonexistent", sys.stdout, sys.stderr])
+
+    def test_alignment_goes_through_the_batch_api(self) -> None:
+        batches: List[List[str]] = []
+
+        class _Aligner:
+            def __init__(self, config: object) -> None:
+                pass
+
+            def align_words(self, *_args: object) -> object:
+                raise AssertionError("files must be aligned through align_words_batch")
+
+            def align_words_batch(
+                self, items: List[Tuple[Path, List[Dict[str, object]]]], *, max_workers: int
+            ) -> List[object]:
+                batches.append([path.name for path, _segments in items])
+                return [
+                    [[{"text": "słowo", "start": seg["start"], "end": seg["end"]}] for seg in segments]
+                    for _path, segments in items
+                ]
+
+        fake_align = types.SimpleNamespace(AlignerConfig=dict, WhisperWordAligner=_Aligner)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = {**self._session_env(tmpdir), "WHISPER_ALIGN": "true"}
+            with mock.patch.dict(sys.modules, {"align": fake_align}):
+                code = self._t.main_api(env, lambda _line: None)
+
+            self.assertEqual(code, 0)
+            self.assertEqual(batches, [["alice_1_seg1.wav"]])
+            user_json = Path(env["OUTPUT_DIR"]) / "session-a" / "transcripts" / "user_1.json"
+            segments = json.loads(user_json.read_text(encoding="utf-8"))["segments"]
+            self.assertEqual([word["text"] for word in segments[0]["words"]], ["słowo"])
+
+    def test_stop_during_last_file_exits_without_outputs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            env = self._session_env(tmpdir)
+            stop = threading.Event()
+            mock_transcribe = self._t.MockWhisperModel.transcribe
+
+            def _transcribe_then_stop(model: object, audio: str, **kwargs: object) -> object:
+                stop.set()
+                return mock_transcribe(model, audio, **kwargs)
+
+            with mock.patch.object(self._t.MockWhisperModel, "transcribe", _transcribe_then_stop):
+                code = self._t.main_api(env, lambda _line: None, stop_event=stop)
+
+            self.assertEqual(code, 130)
+            transcripts = Path(env["OUTPUT_DIR"]) / "session-a" / "transcripts"
+            self.assertFalse((transcripts / "user_1.json").exists())
 
 
 if __name__ == "__main__":  # pragma: no cover - manual execution
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+
+import pytest
+
+# Tkinter needs a display; skip the module at collection time so headless runs never import it.
+collect_ignore_glob = [] if os.environ.get("DISPLAY") else ["test_app.py"]
+
+_SUMMARY_MANIFEST = json.dumps(
+    {
+        "created_at": "2024-01-01T12:00:00",
+        "channel": "general",
+        "users": ["alice", "bob"],
+        "duration": 123.4,
+    }
+).encode("utf8")
+_VALID_MANIFEST = json.dumps(
+    {
+        "transcripts": {
+            "alice": {
+                "wav_path": ["alice.wav"],
+                "json_path": "../out/session/transcripts/user.json",
+                "srt_path": "../out/session/transcripts/user.srt",
+                "vtt_path": "../out/session/transcripts/user.vtt",
+            }
+        }
+    }
+).encode("utf8")
+_MISSING_MANIFEST = json.dumps(
+    {
+        "transcripts": {
+            "alice": {
+                "wav_path": ["missing.wav"],
+                "json_path": "../out/session/transcripts/user.json",
+                "srt_path": "",
+                "vtt_path": None,
+            }
+        }
+    }
+).encode("utf8")
+
+
+@pytest.fixture(scope="session")
+def sessions_tree(request: pytest.FixtureRequest, tmp_path_factory: pytest.TempPathFactory) -> Path:
+    """Session layouts for the ``ui.services.sessions`` tests, written once per worker.
+
+    * ``discover/session-1`` – summary manifest plus one recording,
+    * ``valid/session`` – transcript manifest whose outputs live in ``valid/out``,
+    * ``missing/session`` – transcript manifest pointing at files that do not exist.
+
+    Tests only read the tree. Under pytest-xdist every worker builds its own copy.
+    """
+
+    worker_id = getattr(request.config, "workerinput", {}).get("workerid", "main")
+    root = tmp_path_factory.mktemp(f"sessions-{worker_id}")
+
+    discover_dir = root / "discover" / "session-1"
+    discover_dir.mkdir(parents=True)
+    (discover_dir / "manifest.json").write_bytes(_SUMMARY_MANIFEST)
+    (discover_dir / "alice.wav").write_bytes(b"data")
+
+    valid_dir = root / "valid" / "session"
+    valid_dir.mkdir(parents=True)
+    (valid_dir / "alice.wav").write_bytes(b"data")
+    out_dir = root / "valid" / "out" / "session" / "transcripts"
+    out_dir.mkdir(parents=True)
+    (out_dir / "user.json").write_bytes(b"{}")
+    (out_dir / "user.srt").write_bytes(b"")
+    (out_dir / "user.vtt").write_bytes(b"")
+    (valid_dir / "manifest.json").write_bytes(_VALID_MANIFEST)
+
+    missing_dir = root / "missing" / "session"
+    missing_dir.mkdir(parents=True)
+    (missing_dir / "manifest.json").write_bytes(_MISSING_MANIFEST)
+    return root
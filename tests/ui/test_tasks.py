@@ -1,7 +1,6 @@
 from __future__ import annotations
 
 import io
-from typing import Any
 
 import pytest
 
@@ -10,8 +9,9 @@ from ui.services.tasks import TaskManager
 
 class DummyProcess:
     def __init__(self) -> None:
-        self.stdout = io.BytesIO(b"log1\nlog2\n")
-        self.stderr = io.BytesIO(b"err1\n")
+        # BufferedReader mirrors the pipe objects subprocess.Popen hands to the pump threads.
+        self.stdout = io.BufferedReader(io.BytesIO(b"log1\nlog2\n"))
+        self.stderr = io.BufferedReader(io.BytesIO(b"err1\n"))
         self._returncode: int | None = None
 
     def wait(self) -> None:
@@ -27,13 +27,13 @@ class DummyProcess:
 def test_task_manager_start(monkeypatch: pytest.MonkeyPatch) -> None:
     dummy = DummyProcess()
 
-    def fake_popen(*args: Any, **kwargs: Any) -> DummyProcess:
+    def fake_popen(*args: object, **kwargs: object) -> DummyProcess:
         return dummy
 
     monkeypatch.setattr("ui.services.tasks.subprocess.Popen", fake_popen)
     manager = TaskManager()
     task = manager.start({}, dry_run=True)
-    task.wait(0.1)
+    assert task.wait(5.0)
     logs = list(task.logs())
     assert any(message.content == "log1" for message in logs)
     manager.stop()
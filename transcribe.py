@@ -3,30 +3,47 @@
 from __future__ import annotations
 
 import argparse
-import glob
+import bisect
+import functools
+import heapq
 import inspect
+import io
 import json
+import operator
 import os
+import queue
 import re
+import shutil
 import sys
+import tempfile
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from datetime import datetime, timezone
+from datetime import datetime
 from pathlib import Path
 from typing import (
     TYPE_CHECKING,
+    Any,
+    Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Mapping,
     Optional,
     Protocol,
     Sequence,
     SupportsFloat,
+    TextIO,
+    Tuple,
     Type,
+    Union,
     cast,
 )
 
+import jsonio
+
 if TYPE_CHECKING:  # pragma: no cover - only for type hints
     from faster_whisper import WhisperModel as _WhisperModelType
 
@@ -42,6 +59,14 @@ try:  # pragma: no cover - optional runtime dependency
 except ImportError:  # pragma: no cover - handled at runtime
     _RuntimeWhisperModel = None
 
+_RuntimeBatchedPipeline: Optional[Callable[..., object]] = None
+try:  # pragma: no cover - faster-whisper >= 1.1 only
+    from faster_whisper import BatchedInferencePipeline as _ImportedBatchedPipeline
+
+    _RuntimeBatchedPipeline = _ImportedBatchedPipeline
+except ImportError:  # pragma: no cover - older faster-whisper or missing package
+    _RuntimeBatchedPipeline = None
+
 
 class NarrativeLogger:
     """Narrator weaving runtime events into a colourful logbook."""
@@ -52,14 +77,22 @@ class NarrativeLogger:
     _COLOR_REFLECTION = "\033[33m"
     _RESET = "\033[0m"
 
-    def __init__(self) -> None:
-        self._process_t0 = time.perf_counter()
-        self._task_stack: List[tuple[str, float]] = []
+    def __init__(self, *, verbose: bool = True, stream: Optional[TextIO] = None) -> None:
+        self.verbose = verbose
+        # ``None`` means whatever ``sys.stdout`` is at print time.
+        self._stream = stream
+        self._process_t0 = time.perf_counter_ns()
+        self._task_stack: List[tuple[str, int]] = []
+        # Worker threads share the narrator; keep multi-line entries intact.
+        self._lock = threading.Lock()
 
     def _timestamp(self) -> str:
-        elapsed = time.perf_counter() - self._process_t0
-        wall_clock = datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
-        return f"[{wall_clock} | +{elapsed:7.2f}s]"
+        centis = (time.perf_counter_ns() - self._process_t0) // 10_000_000
+        tm = time.gmtime()
+        return (
+            f"[{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}T"
+            f"{tm.tm_hour:02d}:{tm.tm_min:02d}:{tm.tm_sec:02d}Z | +{centis // 100:4d}.{centis % 100:02d}s]"
+        )
 
     @staticmethod
     def _format_context(context: Optional[Dict[str, object]]) -> str:
@@ -71,14 +104,18 @@ class NarrativeLogger:
         return " | ".join(fragments)
 
     def log_start(self, task_name: str, details: Optional[Dict[str, object]] = None) -> None:
-        self._task_stack.append((task_name, time.perf_counter()))
+        self._task_stack.append((task_name, time.perf_counter_ns()))
         ctx = self._format_context(details)
         narrative = (
             f"Skryba unosi pióro i rozpoczyna wyprawę '{task_name}'."
             if not ctx
             else f"Skryba unosi pióro i rozpoczyna wyprawę '{task_name}' ({ctx})."
         )
-        print(f"{self._timestamp()} {self._COLOR_NARRATION}{narrative}{self._RESET}")
+        with self._lock:
+            print(
+                f"{self._timestamp()} {self._COLOR_NARRATION}{narrative}{self._RESET}",
+                file=self._stream,
+            )
 
     def log_event(self, event: str, context: Optional[Dict[str, object]] = None) -> None:
         ctx = self._format_context(context)
@@ -87,7 +124,17 @@ class NarrativeLogger:
             if not ctx
             else f"Spoglądam na scenę: {event} — {ctx}."
         )
-        print(f"{self._timestamp()} {self._COLOR_EVENT}{storyline}{self._RESET}")
+        with self._lock:
+            print(
+                f"{self._timestamp()} {self._COLOR_EVENT}{storyline}{self._RESET}",
+                file=self._stream,
+            )
+
+    def log_detail(self, event: str, context: Optional[Dict[str, object]] = None) -> None:
+        """Like :meth:`log_event`, but only when the narrator is ``verbose``."""
+
+        if self.verbose:
+            self.log_event(event, context)
 
     def log_result(
         self,
@@ -100,34 +147,42 @@ class NarrativeLogger:
         duration = None
         if self._task_stack:
             task_name, start_t = self._task_stack.pop()
-            duration = time.perf_counter() - start_t
+            duration = (time.perf_counter_ns() - start_t) // 10_000_000
 
         headline = (
             f"Domykam kronikę etapu '{task_name}': {result}."
             if task_name
             else f"Domykam kronikę: {result}."
         )
-        print(f"{self._timestamp()} {self._COLOR_SUCCESS}{headline}{self._RESET}")
-
         block_lines = []
         if duration is not None:
-            block_lines.append(f"czas: {duration:0.2f}s")
+            block_lines.append(f"czas: {duration // 100}.{duration % 100:02d}s")
         if stats:
             for key, value in stats.items():
                 block_lines.append(f"{key}: {value}")
-        print("  == KONIEC ETAPU ==")
-        for line in block_lines:
-            print(f"    • {line}")
 
-        if reflection:
-            print(
-                f"{self._timestamp()} {self._COLOR_REFLECTION}Refleksja systemowa: {reflection}{self._RESET}"
-            )
+        with self._lock:
+            print(f"{self._timestamp()} {self._COLOR_SUCCESS}{headline}{self._RESET}", file=self._stream)
+            print("  == KONIEC ETAPU ==", file=self._stream)
+            for line in block_lines:
+                print(f"    • {line}", file=self._stream)
+
+            if reflection:
+                print(
+                    f"{self._timestamp()} {self._COLOR_REFLECTION}Refleksja systemowa: {reflection}{self._RESET}",
+                    file=self._stream,
+                )
+
 
 _NOISE_RE = re.compile(
     r"(?:^|\s)(?:[?!.,:;]\s*)*(?:uhm+|um+|eh+|eee+|yyy+)(?:\s*[?!.,:;])*(?=\s|$)",
     flags=re.IGNORECASE,
 )
+_WS_RE = re.compile(r"\s+")
+# One pass for: collapse whitespace, squeeze repeated punctuation, drop whitespace before punctuation.
+# Only runs that actually change are matched, so plain words and single spaces skip the callback.
+_CLEAN_RE = re.compile(r"\s+([?!.,:;])\1*|([?!.,:;])\2+| \s+|[^\S ]\s*")
+_UNSAFE_ID_RE = re.compile(r"[^0-9A-Za-z]+")
 
 
 @dataclass
@@ -159,6 +214,10 @@ class TranscribeConfig:
     align_words: bool
     profile: Optional[str]
     mock_transcriber: bool
+    batch_size: int = 1
+    model_cache_dir: Optional[Path] = None
+    num_workers: int = 1
+    dedup_strict: bool = False
 
 
 class WhisperSegment(Protocol):
@@ -167,8 +226,20 @@ class WhisperSegment(Protocol):
     text: str
 
 
+_COMPUTE_TYPES: Tuple[str, ...] = (
+    "auto",
+    "int8_float16",
+    "int8_bfloat16",
+    "int8",
+    "float16",
+    "bfloat16",
+    "float32",
+    "default",
+)
+
 DEFAULT_POLICIES = {
-    "cuda": {"model": "large-v3", "compute": "int8_float16"},
+    # "auto" lets CTranslate2 pick the fastest compute type the GPU supports.
+    "cuda": {"model": "large-v3", "compute": "auto"},
     "cpu": {"model": "medium", "compute": "int8"},
 }
 
@@ -206,6 +277,7 @@ OOM_SIGNATURES: Sequence[str] = (
     "CUBLAS_STATUS_ALLOC_FAILED",
     "OOM",
 )
+_OOM_SIGNATURES_LOWER: Tuple[str, ...] = tuple(signature.lower() for signature in OOM_SIGNATURES)
 
 
 def _first_not_none(*values: Optional[str], default: Optional[str] = None) -> Optional[str]:
@@ -235,8 +307,12 @@ def _parse_int(value: Optional[str], default: int) -> int:
         return default
 
 
+@functools.lru_cache(maxsize=1)
 def _build_vad_parameters() -> Dict[str, int]:
-    """Return VAD parameters compatible with the installed faster-whisper version."""
+    """Return VAD parameters compatible with the installed faster-whisper version.
+
+    The result is cached; callers must copy it before handing it out.
+    """
 
     pad_ms = 120
     parameters: Dict[str, int] = {"min_silence_duration_ms": 500}
@@ -256,7 +332,10 @@ def _build_vad_parameters() -> Dict[str, int]:
     return parameters
 
 
+@functools.lru_cache(maxsize=1)
 def _cuda_available() -> bool:
+    """Probe for a CUDA device once per process (importing torch is slow)."""
+
     try:
         import torch
 
@@ -270,10 +349,41 @@ def _cuda_available() -> bool:
             return False
 
 
-def _normalise_punctuation(text: str) -> str:
-    text = re.sub(r"([?!.,:;])\1+", r"\1", text)
-    text = re.sub(r"\s+([?!.,:;])", r"\1", text)
-    return text
+@functools.lru_cache(maxsize=1)
+def _cuda_int8_supported() -> bool:
+    """Return whether CTranslate2 can run int8 on the first GPU (some new GPUs cannot)."""
+
+    try:
+        import ctranslate2
+    except ImportError:
+        return True  # cannot tell; keep the int8 ladder
+    try:
+        return "int8" in ctranslate2.get_supported_compute_types("cuda", device_index=0)
+    except Exception:  # pragma: no cover - driver/runtime specific
+        return True
+
+
+@functools.lru_cache(maxsize=1)
+def _cpu_compute_type() -> str:
+    """Return the CPU compute type used when none is configured.
+
+    int8 weights with bfloat16 activations where CTranslate2 reports support
+    (AVX512-BF16/AMX or Arm BF16 cores), plain int8 otherwise.
+    """
+
+    try:
+        import ctranslate2
+    except ImportError:
+        return "int8"
+    try:
+        supported = ctranslate2.get_supported_compute_types("cpu")
+    except Exception:  # pragma: no cover - runtime specific
+        return "int8"
+    return "int8_bfloat16" if "int8_bfloat16" in supported else "int8"
+
+
+def _clean_match(match: "re.Match[str]") -> str:
+    return match.group(1) or match.group(2) or " "
 
 
 def _require_whisper_model() -> Type["_WhisperModelType"]:
@@ -286,9 +396,41 @@ def _require_whisper_model() -> Type["_WhisperModelType"]:
     return _RuntimeWhisperModel
 
 
+_CLI_FIELDS: Tuple[str, ...] = (
+    "recordings",
+    "output",
+    "session",
+    "profile",
+    "device",
+    "model",
+    "compute_type",
+    "beam_size",
+    "batch_size",
+    "model_cache",
+    "num_workers",
+    "language",
+    "vad_filter",
+    "sanitize_lower_noise",
+    "align_words",
+    "dedup_strict",
+)
+
+
 def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
-    """Return CLI arguments overriding environment defaults."""
+    """Return CLI arguments overriding environment defaults.
+
+    Without arguments (the usual env-driven run) the parser is not built at
+    all; every field in ``_CLI_FIELDS`` is ``None``.
+    """
+
+    if argv is None:
+        argv = sys.argv[1:]
+    if not argv:
+        return argparse.Namespace(**dict.fromkeys(_CLI_FIELDS))
+    return _build_parser().parse_args(argv)
+
 
+def _build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(
         description="Transkrybuj nagrania Discorda przy użyciu faster-whisper.",
     )
@@ -308,10 +450,29 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
     parser.add_argument("--model", help="Wymuszony rozmiar modelu whisper (np. small, medium, large-v3)")
     parser.add_argument(
         "--compute-type",
-        choices=["int8_float16", "int8", "float16"],
-        help="Tryb obliczeń dla modelu whisper",
+        choices=_COMPUTE_TYPES,
+        help=(
+            "Tryb obliczeń dla modelu whisper; auto wybiera najszybszy typ wspierany przez sprzęt, "
+            "float32/default na GPU zamieniam na float16 "
+            "(zob. https://opennmt.net/CTranslate2/quantization.html)"
+        ),
     )
     parser.add_argument("--beam-size", type=int, help="Rozmiar wiązki segmentów")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        help="Rozmiar batcha BatchedInferencePipeline na GPU (1 wyłącza batchowanie)",
+    )
+    parser.add_argument(
+        "--model-cache",
+        type=Path,
+        help="Katalog na modele przekonwertowane do CTranslate2 (int8/int8_float16) przy pierwszym użyciu",
+    )
+    parser.add_argument(
+        "--num-workers",
+        type=int,
+        help="Liczba plików WAV transkrybowanych równolegle (domyślnie 2 na GPU)",
+    )
     parser.add_argument("--language", help="Język docelowy dla modelu (np. pl, en)")
     parser.add_argument(
         "--vad",
@@ -349,119 +510,217 @@ def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
         action="store_false",
         help="Pomiń generowanie znaczników słów",
     )
-    parser.set_defaults(vad_filter=None, sanitize_lower_noise=None, align_words=None)
-    return parser.parse_args(argv)
+    parser.add_argument(
+        "--dedup-strict",
+        dest="dedup_strict",
+        action="store_true",
+        help="Usuwaj powtórzenia także wtedy, gdy nie sąsiadują ze sobą (okno 1,5 s)",
+    )
+    parser.set_defaults(
+        vad_filter=None, sanitize_lower_noise=None, align_words=None, dedup_strict=None
+    )
+    return parser
 
 
 def _cli_overrides(args: Optional[argparse.Namespace]) -> bool:
     if args is None:
         return False
-    for name in (
-        "recordings",
-        "output",
-        "session",
-        "profile",
-        "device",
-        "model",
-        "compute_type",
-        "beam_size",
-        "language",
-        "vad_filter",
-        "sanitize_lower_noise",
-        "align_words",
-    ):
-        if getattr(args, name, None) is not None:
-            return True
-    return False
-
-
-def load_config(args: Optional[argparse.Namespace] = None) -> TranscribeConfig:
-    """Load configuration from environment variables and optional CLI overrides."""
-
-    recordings_override = getattr(args, "recordings", None) if args else None
+    return any(getattr(args, name, None) is not None for name in _CLI_FIELDS)
+
+
+_ENV_KEYS: Tuple[str, ...] = (
+    "RECORDINGS_DIR",
+    "OUTPUT_DIR",
+    "SESSION_DIR",
+    "WHISPER_PROFILE",
+    "WHISPER_DEVICE",
+    "WHISPER_MODEL",
+    "WHISPER_COMPUTE",
+    "WHISPER_SEGMENT_BEAM",
+    "WHISPER_BATCH_SIZE",
+    "WHISPER_MODEL_CACHE_DIR",
+    "WHISPER_NUM_WORKERS",
+    "WHISPER_LANG",
+    "WHISPER_VAD",
+    "SANITIZE_LOWER_NOISE",
+    "WHISPER_ALIGN",
+    "WHISPER_DEDUP_STRICT",
+    "WHISPER_MOCK",
+)
+
+
+@dataclass(frozen=True)
+class _EnvDefaults:
+    """Environment part of the configuration, parsed once per distinct set of values."""
+
+    recordings_dir: Path
+    output_dir: Path
+    session_dir: Optional[str]
+    profile: Optional[str]
+    device: Optional[str]
+    model: Optional[str]
+    compute: Optional[str]
+    beam: Optional[str]
+    batch_size: Optional[str]
+    model_cache_dir: Optional[str]
+    num_workers: Optional[str]
+    language: Optional[str]
+    vad_filter: bool
+    sanitize_lower_noise: bool
+    align_words: bool
+    dedup_strict: bool
+    mock: Optional[str]
+
+
+@functools.lru_cache(maxsize=1)
+def _parse_env(values: Tuple[Optional[str], ...]) -> _EnvDefaults:
+    env = dict(zip(_ENV_KEYS, values, strict=True))
+    recordings = env["RECORDINGS_DIR"]
+    output = env["OUTPUT_DIR"]
+    return _EnvDefaults(
+        recordings_dir=Path(recordings if recordings is not None else "./recordings").expanduser(),
+        output_dir=Path(output if output is not None else "./out").expanduser(),
+        session_dir=env["SESSION_DIR"],
+        profile=env["WHISPER_PROFILE"],
+        device=env["WHISPER_DEVICE"],
+        model=env["WHISPER_MODEL"],
+        compute=env["WHISPER_COMPUTE"],
+        beam=env["WHISPER_SEGMENT_BEAM"],
+        batch_size=env["WHISPER_BATCH_SIZE"],
+        model_cache_dir=env["WHISPER_MODEL_CACHE_DIR"],
+        num_workers=env["WHISPER_NUM_WORKERS"],
+        language=env["WHISPER_LANG"],
+        vad_filter=_strtobool_env(env["WHISPER_VAD"], True),
+        sanitize_lower_noise=_strtobool_env(env["SANITIZE_LOWER_NOISE"], False),
+        align_words=_strtobool_env(env["WHISPER_ALIGN"], False),
+        dedup_strict=_strtobool_env(env["WHISPER_DEDUP_STRICT"], False),
+        mock=env["WHISPER_MOCK"],
+    )
+
+
+def _env_defaults(environ: Optional[Mapping[str, str]] = None) -> _EnvDefaults:
+    """Return the parsed environment; re-parsed only when one of ``_ENV_KEYS`` changes.
+
+    ``environ`` defaults to ``os.environ``.
+    """
+
+    source = os.environ if environ is None else environ
+    return _parse_env(tuple(source.get(key) for key in _ENV_KEYS))
+
+
+# CLI field -> (``_EnvDefaults`` attribute, ``PROFILE_PRESETS`` key), in precedence order.
+_CONFIG_SOURCES: Dict[str, Tuple[str, str]] = {
+    "device": ("device", "device"),
+    "model": ("model", "model"),
+    "compute_type": ("compute", "compute"),
+    "language": ("language", "language"),
+}
+
+
+def _resolve(
+    cli: Mapping[str, object],
+    env: _EnvDefaults,
+    profile_defaults: Mapping[str, object],
+    field: str,
+    default: Optional[str] = None,
+) -> Optional[str]:
+    """Return the first non-blank of CLI flag, environment, profile preset and ``default``."""
+
+    env_attr, profile_key = _CONFIG_SOURCES[field]
+    cli_value = cli.get(field)
+    profile_value = profile_defaults.get(profile_key) if profile_defaults else None
+    return _first_not_none(
+        str(cli_value) if cli_value is not None else None,
+        getattr(env, env_attr),
+        str(profile_value) if profile_defaults else None,
+        default,
+    )
+
+
+def load_config(
+    args: Optional[argparse.Namespace] = None,
+    *,
+    environ: Optional[Mapping[str, str]] = None,
+    stream: Optional[TextIO] = None,
+) -> TranscribeConfig:
+    """Load configuration from environment variables and optional CLI overrides.
+
+    ``environ`` replaces ``os.environ`` as the variable source and policy
+    warnings go to ``stream`` (``sys.stderr`` by default). ``output_dir`` is
+    only expanded here; :func:`main` resolves it right before creating it.
+    """
+
+    env = _env_defaults(environ)
+    warn_stream = sys.stderr if stream is None else stream
+    cli: Dict[str, object] = vars(args) if args is not None else {}
+
+    recordings_override = cli.get("recordings")
     if recordings_override is not None:
-        recordings_dir = Path(recordings_override).expanduser().resolve()
+        recordings_dir = Path(cast(Path, recordings_override)).expanduser().resolve()
     else:
-        recordings_dir = Path(os.environ.get("RECORDINGS_DIR", "./recordings")).expanduser().resolve()
+        recordings_dir = env.recordings_dir.resolve()
 
-    output_override = getattr(args, "output", None) if args else None
-    if output_override is not None:
-        output_dir = Path(output_override).expanduser().resolve()
-    else:
-        output_dir = Path(os.environ.get("OUTPUT_DIR", "./out")).expanduser().resolve()
+    output_override = cli.get("output")
+    output_dir = Path(cast(Path, output_override)).expanduser() if output_override is not None else env.output_dir
 
-    session_override = getattr(args, "session", None) if args else None
-    session_env = os.environ.get("SESSION_DIR") if session_override is None else session_override
+    session_override = cli.get("session")
+    session_env = env.session_dir if session_override is None else session_override
     session_dir = None
     if session_env:
-        raw_session = Path(session_env).expanduser()
+        raw_session = Path(cast(Path, session_env)).expanduser()
         session_dir = raw_session if raw_session.is_absolute() else recordings_dir / raw_session
 
-    profile_override = getattr(args, "profile", None) if args else None
-    profile_env = os.environ.get("WHISPER_PROFILE")
-    profile_name = _first_not_none(profile_override, profile_env, default=None)
+    profile_override = cli.get("profile")
+    profile_name = _first_not_none(cast(Optional[str], profile_override), env.profile, default=None)
     profile_defaults = PROFILE_PRESETS.get(profile_name or "", {})
 
-    requested_device_override = getattr(args, "device", None) if args else None
-    requested_device = (
-        _first_not_none(
-            requested_device_override,
-            os.environ.get("WHISPER_DEVICE"),
-            str(profile_defaults.get("device")) if profile_defaults else None,
-            "cuda",
-        )
-        or "cuda"
-    ).lower()
+    requested_device = (_resolve(cli, env, profile_defaults, "device", "cuda") or "cuda").lower()
     if requested_device not in {"cuda", "cpu"}:
         print(
             f"[!] Nieznany WHISPER_DEVICE={requested_device}, używam domyślnego cuda.",
-            file=sys.stderr,
+            file=warn_stream,
         )
         requested_device = "cuda"
 
     policy_defaults = DEFAULT_POLICIES[requested_device]
 
-    model_override = getattr(args, "model", None) if args else None
-    model_candidate = _first_not_none(
-        model_override,
-        os.environ.get("WHISPER_MODEL"),
-        str(profile_defaults.get("model")) if profile_defaults else None,
-    )
-    model_size = model_candidate or policy_defaults["model"]
+    model_size = _resolve(cli, env, profile_defaults, "model") or policy_defaults["model"]
 
-    compute_override = getattr(args, "compute_type", None) if args else None
+    default_compute = (
+        _cpu_compute_type() if requested_device == "cpu" else policy_defaults["compute"]
+    )
     compute_type = (
-        _first_not_none(
-            compute_override,
-            os.environ.get("WHISPER_COMPUTE"),
-            str(profile_defaults.get("compute")) if profile_defaults else None,
-            policy_defaults["compute"],
-        )
-        or policy_defaults["compute"]
+        _resolve(cli, env, profile_defaults, "compute_type", default_compute) or default_compute
     ).lower()
 
-    valid_compute_types = {"int8_float16", "int8", "float16"}
-    if compute_type not in valid_compute_types:
+    if compute_type not in _COMPUTE_TYPES:
         print(
-            f"[!] Nieznany WHISPER_COMPUTE={compute_type}, używam polityki domyślnej {policy_defaults['compute']}.",
-            file=sys.stderr,
+            f"[!] Nieznany WHISPER_COMPUTE={compute_type}, używam polityki domyślnej {default_compute}.",
+            file=warn_stream,
         )
-        compute_type = policy_defaults["compute"]
+        compute_type = default_compute
 
     device = requested_device
     if requested_device == "cuda" and not _cuda_available():
         print(
             "[policy] CUDA nie jest dostępna, przełączam na CPU z polityką awaryjną.",
-            file=sys.stderr,
+            file=warn_stream,
         )
         device = "cpu"
         cpu_defaults = DEFAULT_POLICIES["cpu"]
-        if "WHISPER_MODEL" not in os.environ:
+        if env.model is None:
             model_size = cpu_defaults["model"]
-        if "WHISPER_COMPUTE" not in os.environ:
-            compute_type = cpu_defaults["compute"]
+        if env.compute is None:
+            compute_type = _cpu_compute_type()
+    elif device == "cuda" and compute_type in {"float32", "default"}:
+        # Full precision only doubles the encoder's memory traffic; tensor cores want half floats.
+        print(
+            f"[policy] WHISPER_COMPUTE={compute_type} na GPU, przełączam na float16.",
+            file=warn_stream,
+        )
+        compute_type = "float16"
 
-    beam_override = getattr(args, "beam_size", None) if args else None
+    beam_override = cast(Optional[int], cli.get("beam_size"))
     if beam_override is not None:
         beam_size = max(1, beam_override)
     else:
@@ -469,33 +728,50 @@ def load_config(args: Optional[argparse.Namespace] = None) -> TranscribeConfig:
         beam_size = max(
             1,
             _parse_int(
-                _first_not_none(os.environ.get("WHISPER_SEGMENT_BEAM"), str(profile_beam) if profile_beam else None),
+                _first_not_none(env.beam, str(profile_beam) if profile_beam else None),
                 5,
             ),
         )
 
-    language_override = getattr(args, "language", None) if args else None
-    language_candidate = _first_not_none(
-        language_override,
-        os.environ.get("WHISPER_LANG"),
-        str(profile_defaults.get("language")) if profile_defaults else None,
+    batch_override = cast(Optional[int], cli.get("batch_size"))
+    if batch_override is not None:
+        batch_size = max(1, batch_override)
+    else:
+        batch_size = max(1, _parse_int(env.batch_size, 8 if device == "cuda" else 1))
+
+    model_cache_override = cli.get("model_cache")
+    model_cache_value = _first_not_none(
+        str(model_cache_override) if model_cache_override is not None else None,
+        env.model_cache_dir,
     )
-    language = language_candidate or "pl"
+    model_cache_dir = Path(model_cache_value).expanduser().resolve() if model_cache_value else None
+
+    workers_override = cast(Optional[int], cli.get("num_workers"))
+    if workers_override is not None:
+        num_workers = max(1, workers_override)
+    else:
+        # CTranslate2 already runs 4 intra-op threads per CPU replica.
+        default_workers = 2 if device == "cuda" else max(1, (os.cpu_count() or 1) // 4)
+        num_workers = max(1, _parse_int(env.num_workers, default_workers))
 
-    vad_override = getattr(args, "vad_filter", None) if args else None
-    vad_filter = vad_override if vad_override is not None else _strtobool_env(os.environ.get("WHISPER_VAD"), True)
-    vad_parameters = _build_vad_parameters()
-    sanitize_override = getattr(args, "sanitize_lower_noise", None) if args else None
+    language = _resolve(cli, env, profile_defaults, "language") or "pl"
+
+    vad_override = cast(Optional[bool], cli.get("vad_filter"))
+    vad_filter = vad_override if vad_override is not None else env.vad_filter
+    vad_parameters = dict(_build_vad_parameters())
+    sanitize_override = cast(Optional[bool], cli.get("sanitize_lower_noise"))
     sanitize_lower_noise = (
         sanitize_override
         if sanitize_override is not None
-        else _strtobool_env(os.environ.get("SANITIZE_LOWER_NOISE"), False)
+        else env.sanitize_lower_noise
     )
-    align_override = getattr(args, "align_words", None) if args else None
-    align_words = align_override if align_override is not None else _strtobool_env(os.environ.get("WHISPER_ALIGN"), False)
+    align_override = cast(Optional[bool], cli.get("align_words"))
+    align_words = align_override if align_override is not None else env.align_words
+    dedup_override = cast(Optional[bool], cli.get("dedup_strict"))
+    dedup_strict = dedup_override if dedup_override is not None else env.dedup_strict
 
     mock_default = bool(profile_defaults.get("mock", False)) if profile_defaults else False
-    mock_transcriber = _strtobool_env(os.environ.get("WHISPER_MOCK"), mock_default)
+    mock_transcriber = _strtobool_env(env.mock, mock_default)
 
     return TranscribeConfig(
         recordings_dir=recordings_dir,
@@ -513,14 +789,18 @@ def load_config(args: Optional[argparse.Namespace] = None) -> TranscribeConfig:
         align_words=align_words,
         profile=profile_name,
         mock_transcriber=mock_transcriber,
+        batch_size=batch_size,
+        model_cache_dir=model_cache_dir,
+        num_workers=num_workers,
+        dedup_strict=dedup_strict,
     )
 
 
 def _is_recoverable_model_error(exc: Exception) -> bool:
-    message = str(exc)
     if isinstance(exc, MemoryError):
         return True
-    return any(signature.lower() in message.lower() for signature in OOM_SIGNATURES)
+    lowered = str(exc).lower()
+    return any(signature in lowered for signature in _OOM_SIGNATURES_LOWER)
 
 
 def build_model_attempts(config: TranscribeConfig) -> List[ModelAttempt]:
@@ -543,15 +823,26 @@ def build_model_attempts(config: TranscribeConfig) -> List[ModelAttempt]:
             )
         )
 
-    _add(config.device, config.model_size, config.compute_type, "konfiguracja bazowa")
-
-    if config.device == "cuda":
-        _add("cuda", config.model_size, "int8", "cuda: wymuszam int8 po OOM")
-        _add("cuda", "medium", "int8_float16", "cuda: zmniejszam model do medium")
-        _add("cuda", "medium", "int8", "cuda: medium + int8")
+    # Without a GPU the CUDA fallbacks would only fail again; go straight to the CPU rows.
+    cuda_ready = config.device == "cuda" and _cuda_available()
+    int8_on_gpu = cuda_ready and _cuda_int8_supported()
+    if not (cuda_ready and not int8_on_gpu and config.compute_type.startswith("int8")):
+        _add(config.device, config.model_size, config.compute_type, "konfiguracja bazowa")
+
+    if cuda_ready:
+        if config.compute_type == "auto":
+            # CTranslate2 already picked the best supported type; only the model size can shrink.
+            _add("cuda", "medium", "auto", "cuda: zmniejszam model do medium")
+        elif int8_on_gpu:
+            _add("cuda", config.model_size, "int8", "cuda: wymuszam int8 po OOM")
+            _add("cuda", "medium", "int8_float16", "cuda: zmniejszam model do medium")
+            _add("cuda", "medium", "int8", "cuda: medium + int8")
+        else:
+            _add("cuda", config.model_size, "float16", "cuda: GPU bez int8, używam float16")
+            _add("cuda", "medium", "bfloat16", "cuda: medium + bfloat16")
 
     cpu_defaults = DEFAULT_POLICIES["cpu"]
-    _add("cpu", cpu_defaults["model"], cpu_defaults["compute"], "CPU fallback polityki")
+    _add("cpu", cpu_defaults["model"], _cpu_compute_type(), "CPU fallback polityki")
     _add("cpu", "small", "int8", "CPU minimalny")
 
     return attempts
@@ -577,11 +868,217 @@ class MockWhisperModel:
         return [segment], {"language": self.language}
 
 
+# Single-slot cache: in-process callers (GUI) reuse the loaded model between runs.
+_model_cache: Dict[Tuple[object, str, str, str, int], "_WhisperModelType"] = {}
+
+
+_CONVERTIBLE_COMPUTE_TYPES = frozenset({"int8", "int8_float16", "int8_bfloat16"})
+
+
+def _converted_model_path(
+    model_size: str,
+    compute_type: str,
+    cache_dir: Optional[Path],
+    narrator: NarrativeLogger,
+) -> Optional[Path]:
+    """Return a pre-quantised CTranslate2 copy of ``model_size``, converting it on first use.
+
+    ``None`` means "load by name as before": no cache directory configured, a
+    compute type that is not quantised ahead of time, a local model path, a
+    missing converter (``ctranslate2`` + ``transformers``) or a failed
+    conversion.
+    """
+
+    if cache_dir is None or compute_type not in _CONVERTIBLE_COMPUTE_TYPES:
+        return None
+    if Path(model_size).expanduser().is_dir():
+        return None
+    target = cache_dir / f"{model_size.replace('/', '--')}-{compute_type}"
+    if (target / "model.bin").is_file():
+        return target
+    try:
+        from ctranslate2.converters import TransformersConverter
+    except ImportError:  # pragma: no cover - optional converter
+        return None
+
+    source = model_size if "/" in model_size else f"openai/whisper-{model_size}"
+    narrator.log_event("Konwertuję model do CTranslate2", {"źródło": source, "compute": compute_type, "cel": target})
+    staging: Optional[Path] = None
+    try:  # pragma: no cover - requires transformers and a model download
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        staging = Path(tempfile.mkdtemp(dir=cache_dir, prefix=f".{target.name}-"))
+        converter = TransformersConverter(source, copy_files=["tokenizer.json", "preprocessor_config.json"])
+        converter.convert(str(staging), quantization=compute_type, force=True)
+        os.replace(staging, target)
+    except Exception as exc:  # pragma: no cover - runtime fallback
+        if staging is not None:
+            shutil.rmtree(staging, ignore_errors=True)
+        narrator.log_event("Konwersja nieudana, ładuję model po nazwie", {"powód": _short_error(exc)})
+        return None
+    return target
+
+
+_MIN_WAV_SECONDS = 0.5
+_WAVE_FORMAT_PCM = 1
+
+
+@dataclass(frozen=True)
+class _WavHeader:
+    """Fields of a RIFF/WAVE header needed to size and map the PCM data."""
+
+    format_tag: int
+    channels: int
+    sample_rate: int
+    bits_per_sample: int
+    byte_rate: int
+    data_offset: int
+    data_length: int
+
+    @property
+    def duration(self) -> float:
+        return self.data_length / self.byte_rate
+
+
+def _probe_wav(path: str, size: int) -> Optional[_WavHeader]:
+    """Return the RIFF/WAVE header of ``path`` or ``None`` if it cannot be read.
+
+    Chunks are walked by their headers, so ``LIST``/``fact`` chunks before
+    ``data`` are skipped without reading them. A data length that was never
+    finalised (0 or 0xFFFFFFFF, e.g. after a crashed recorder) or that runs
+    past the end of the file is clamped to the bytes actually present.
+    """
+
+    try:
+        with open(path, "rb") as handle:
+            header = handle.read(12)
+            if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+                return None
+            fmt = b""
+            while True:
+                chunk = handle.read(8)
+                if len(chunk) < 8:
+                    return None
+                chunk_id = chunk[:4]
+                chunk_size = int.from_bytes(chunk[4:], "little")
+                if chunk_id == b"data":
+                    byte_rate = int.from_bytes(fmt[8:12], "little")
+                    if not byte_rate:
+                        return None
+                    data_offset = handle.tell()
+                    available = size - data_offset
+                    if chunk_size in (0, 0xFFFFFFFF) or chunk_size > available:
+                        chunk_size = available
+                    return _WavHeader(
+                        format_tag=int.from_bytes(fmt[0:2], "little"),
+                        channels=int.from_bytes(fmt[2:4], "little"),
+                        sample_rate=int.from_bytes(fmt[4:8], "little"),
+                        bits_per_sample=int.from_bytes(fmt[14:16], "little"),
+                        byte_rate=byte_rate,
+                        data_offset=data_offset,
+                        data_length=chunk_size,
+                    )
+                if chunk_id == b"fmt ":
+                    fmt = handle.read(min(chunk_size, 16))
+                    if len(fmt) < 16:
+                        return None
+                    chunk_size -= len(fmt)
+                handle.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+    except OSError:
+        return None
+
+
+def _load_pcm16k(
+    path: str, header: _WavHeader, *, start_frame: int = 0, stop_frame: Optional[int] = None
+) -> Optional[object]:
+    """Decode 16-bit PCM into the 16 kHz mono float32 array ``model.transcribe`` expects.
+
+    Samples are memory-mapped and channels are averaged, which covers the bot's
+    48 kHz stereo recordings without faster-whisper's ffmpeg decode. Rates other
+    than 16 kHz are resampled with ``soxr`` when it is installed. Any other
+    layout, or a missing NumPy/soxr, returns ``None`` and the path is passed
+    through as before. ``start_frame``/``stop_frame`` (in source frames) map
+    only that window; the result then starts at ``start_frame / sample_rate``.
+    """
+
+    channels = header.channels
+    if header.format_tag != _WAVE_FORMAT_PCM or header.bits_per_sample != 16 or channels < 1:
+        return None
+    resample = header.sample_rate != 16000
+    if resample:
+        try:
+            import soxr
+        except ImportError:  # pragma: no cover - optional resampler
+            return None
+    try:
+        import numpy as np
+    except ImportError:  # pragma: no cover - numpy ships with faster-whisper
+        return None
+    total = header.data_length // (2 * channels)
+    start_frame = min(max(0, start_frame), total)
+    stop_frame = total if stop_frame is None else min(max(start_frame, stop_frame), total)
+    frames = stop_frame - start_frame
+    if not frames:
+        return None
+    pcm = np.memmap(
+        path,
+        dtype="<i2",
+        mode="r",
+        offset=header.data_offset + start_frame * 2 * channels,
+        shape=(frames, channels),
+    )
+    try:
+        if channels == 1:
+            audio = pcm[:, 0].astype(np.float32) / 32768.0
+        else:
+            audio = pcm.mean(axis=1, dtype=np.float32) / 32768.0
+    finally:
+        del pcm
+    if resample:
+        audio = soxr.resample(audio, header.sample_rate, 16000)
+    return audio
+
+
+# Files handed to the aligner at once, and how many of them have their audio read ahead.
+_ALIGN_BATCH_MAX = 8
+_ALIGN_PREFETCH = 2
+
+
+# Upper bounds (seconds) of the short/medium file buckets; everything longer is the last bucket.
+_DURATION_BUCKETS_S: Tuple[float, ...] = (10.0, 30.0)
+
+
+def _duration_bucket(seconds: float) -> int:
+    """Return the length bucket of a file: 0 for <10 s, 1 for 10–30 s, 2 for 30 s+."""
+
+    return bisect.bisect_right(_DURATION_BUCKETS_S, seconds)
+
+
 def _short_error(exc: Exception) -> str:
     message = str(exc).strip().splitlines()[0] if str(exc).strip() else exc.__class__.__name__
     return message[:160]
 
 
+class _PerThreadPipeline:
+    """Give every calling thread its own ``BatchedInferencePipeline`` over one shared model.
+
+    Nothing guarantees a pipeline object is safe to call from several threads
+    at once, while ``WhisperModel`` is: CTranslate2 runs up to ``num_workers``
+    concurrent calls on its replicas. The pipelines are thin wrappers, so one
+    per transcription worker costs no model memory.
+    """
+
+    def __init__(self, pipeline_cls: Callable[..., Any], model: object) -> None:
+        self._pipeline_cls = pipeline_cls
+        self._model = model
+        self._local = threading.local()
+
+    def transcribe(self, audio: object, **kwargs: object) -> Any:
+        pipeline = getattr(self._local, "pipeline", None)
+        if pipeline is None:
+            pipeline = self._local.pipeline = self._pipeline_cls(model=self._model)
+        return pipeline.transcribe(audio, **kwargs)
+
+
 def load_whisper_model(
     config: TranscribeConfig,
     narrator: NarrativeLogger,
@@ -594,38 +1091,64 @@ def load_whisper_model(
             "Profil mock - pomijam ładowanie prawdziwego modelu",
             {"język": config.language},
         )
+        config.batch_size = 1
         return MockWhisperModel(language=config.language)
 
     attempts = build_model_attempts(config)
     baseline_signature = f"{config.model_size}/{config.compute_type}@{config.device}"
 
     for attempt in attempts:
-        narrator.log_event(
-            "Próba inicjalizacji wariantu",
-            {
-                "model": attempt.model_size,
-                "device": attempt.device,
-                "compute": attempt.compute_type,
-                "powód": attempt.reason,
-            },
+        cache_key = (
+            whisper_model_cls,
+            attempt.model_size,
+            attempt.device,
+            attempt.compute_type,
+            config.num_workers,
         )
-        try:
-            model = whisper_model_cls(
-                attempt.model_size,
-                device=attempt.device,
-                compute_type=attempt.compute_type,
+        model = _model_cache.get(cache_key)
+        if model is not None:
+            narrator.log_event(
+                "Model już czeka w pamięci",
+                {"model": attempt.model_size, "device": attempt.device, "compute": attempt.compute_type},
             )
-        except Exception as exc:  # pragma: no cover - runtime fallback
-            if _is_recoverable_model_error(exc):
-                narrator.log_event(
-                    "Model odrzucił wariant",
-                    {
-                        "powód": _short_error(exc),
-                        "próbowałem": f"{attempt.model_size}/{attempt.compute_type}@{attempt.device}",
-                    },
+        else:
+            narrator.log_event(
+                "Próba inicjalizacji wariantu",
+                {
+                    "model": attempt.model_size,
+                    "device": attempt.device,
+                    "compute": attempt.compute_type,
+                    "powód": attempt.reason,
+                },
+            )
+            converted = _converted_model_path(
+                attempt.model_size, attempt.compute_type, config.model_cache_dir, narrator
+            )
+            # One CTranslate2 replica per worker thread so parallel calls do not queue up.
+            replicas: Dict[str, Any] = {"num_workers": config.num_workers} if config.num_workers > 1 else {}
+            if attempt.device == "cpu" and "OMP_NUM_THREADS" not in os.environ:
+                # Split the cores between the replicas; CTranslate2 would otherwise use 4 each.
+                replicas["cpu_threads"] = max(1, (os.cpu_count() or 1) // config.num_workers)
+            try:
+                model = whisper_model_cls(
+                    str(converted) if converted is not None else attempt.model_size,
+                    device=attempt.device,
+                    compute_type=attempt.compute_type,
+                    **replicas,
                 )
-                continue
-            raise
+            except Exception as exc:  # pragma: no cover - runtime fallback
+                if _is_recoverable_model_error(exc):
+                    narrator.log_event(
+                        "Model odrzucił wariant",
+                        {
+                            "powód": _short_error(exc),
+                            "próbowałem": f"{attempt.model_size}/{attempt.compute_type}@{attempt.device}",
+                        },
+                    )
+                    continue
+                raise
+            _model_cache.clear()
+            _model_cache[cache_key] = model
 
         if attempt.reason != "konfiguracja bazowa":
             narrator.log_event(
@@ -639,6 +1162,10 @@ def load_whisper_model(
         config.device = attempt.device
         config.model_size = attempt.model_size
         config.compute_type = attempt.compute_type
+        if attempt.device == "cuda" and config.batch_size > 1 and _RuntimeBatchedPipeline is not None:
+            narrator.log_event("Włączam batchowanie segmentów", {"batch_size": config.batch_size})
+            return cast("_WhisperModelType", _PerThreadPipeline(_RuntimeBatchedPipeline, model))
+        config.batch_size = 1
         return model
 
     raise RuntimeError("Żaden wariant modelu nie został zainicjalizowany")
@@ -647,15 +1174,22 @@ def load_whisper_model(
 def sanitize_text(text: str, *, lower_noise: bool = False) -> str:
     """Normalise whitespace and tame repeated punctuation."""
 
-    text = re.sub(r"\s+", " ", text.strip())
-    text = _normalise_punctuation(text)
+    text = _CLEAN_RE.sub(_clean_match, text.strip())
     if lower_noise:
-        text = _NOISE_RE.sub(" ", text)
-        text = re.sub(r"\s{2,}", " ", text)
-        text = _normalise_punctuation(text).strip()
+        text = _CLEAN_RE.sub(_clean_match, _NOISE_RE.sub(" ", text)).strip()
     return text
 
 
+def sanitize_texts(texts: Iterable[str], *, lower_noise: bool = False) -> List[str]:
+    """Batch form of :func:`sanitize_text` for all segments of one file."""
+
+    clean = functools.partial(_CLEAN_RE.sub, _clean_match)
+    if not lower_noise:
+        return [clean(text.strip()) for text in texts]
+    noise = functools.partial(_NOISE_RE.sub, " ")
+    return [clean(noise(clean(text.strip()))).strip() for text in texts]
+
+
 def soft_merge_segments(
     segments: List[Dict[str, object]],
     *,
@@ -664,7 +1198,14 @@ def soft_merge_segments(
     short_threshold: float = 1.0,
     lower_noise: bool = False,
 ) -> List[Dict[str, object]]:
-    """Merge very short segments when they are close and share the same speaker."""
+    """Merge very short segments when they are close and share the same speaker.
+
+    Only the first segment of every merged group is cloned; later members
+    contribute their text, files and words directly. Group start/end times
+    are tracked in locals instead of being re-read from the output dicts.
+    Word lists are copied but the word dicts are shared with the input; they
+    are never modified here.
+    """
 
     if not segments:
         return []
@@ -672,113 +1213,203 @@ def soft_merge_segments(
     def _clone_segment(data: Dict[str, object]) -> Dict[str, object]:
         cloned = dict(data)
         if "words" in cloned and isinstance(cloned["words"], list):
-            cloned["words"] = [dict(word) for word in cloned["words"]]  # shallow copy
+            cloned["words"] = list(cloned["words"])
         return cloned
 
-    merged: List[Dict[str, object]] = [_clone_segment(segments[0])]
-    for seg in segments[1:]:
-        current = _clone_segment(seg)
-        prev = merged[-1]
-        current_start = cast(float, current["start"])
-        current_end = cast(float, current["end"])
-        prev_start = cast(float, prev["start"])
-        prev_end = cast(float, prev["end"])
-        gap = current_start - prev_end
-        current_duration = current_end - current_start
-        prev_duration = prev_end - prev_start
-        same_user = True
-        if user_key is not None:
-            same_user = prev.get(user_key) == current.get(user_key)
-
-        if (
-            same_user
-            and 0 <= gap <= max_gap
-            and (current_duration < short_threshold or prev_duration < short_threshold)
-        ):
-            prev["end"] = max(prev_end, current_end)
-            prev_text = str(prev.get("text", ""))
-            curr_text = str(current.get("text", ""))
-            prev["text"] = sanitize_text(f"{prev_text} {curr_text}", lower_noise=lower_noise)
-            if "files" in current:
-                prev.setdefault("files", [])
-                prev_files = list(cast(Iterable[str], prev.get("files", [])))
-                prev_files.extend(list(cast(Iterable[str], current.get("files", []))))
-                prev["files"] = prev_files
-            if "words" in current or "words" in prev:
-                prev_words = list(
-                    cast(Iterable[Dict[str, object]], prev.get("words", []))
-                )
-                curr_words = cast(Iterable[Dict[str, object]], current.get("words", []))
-                prev_words.extend(list(curr_words))
-                prev["words"] = prev_words
-            continue
+    merged: List[Dict[str, object]] = []
+    prev: Dict[str, object] = {}
+    prev_start = prev_end = 0.0
+    prev_user: object = None
+    owns_files = False
+    for seg in segments:
+        current_start = cast(float, seg["start"])
+        current_end = cast(float, seg["end"])
+        if merged:
+            gap = current_start - prev_end
+            same_user = user_key is None or prev_user == seg.get(user_key)
+            if (
+                same_user
+                and 0 <= gap <= max_gap
+                and (current_end - current_start < short_threshold or prev_end - prev_start < short_threshold)
+            ):
+                prev_end = max(prev_end, current_end)
+                prev["end"] = prev_end
+                prev_text = str(prev.get("text", ""))
+                curr_text = str(seg.get("text", ""))
+                prev["text"] = sanitize_text(f"{prev_text} {curr_text}", lower_noise=lower_noise)
+                if "files" in seg:
+                    if not owns_files:
+                        prev["files"] = list(cast(Iterable[str], prev.get("files", [])))
+                        owns_files = True
+                    cast(List[str], prev["files"]).extend(cast(Iterable[str], seg["files"]))
+                if "words" in seg or "words" in prev:
+                    curr_words = seg.get("words", [])
+                    prev_words = prev.get("words", [])
+                    if not isinstance(prev_words, list):
+                        prev_words = list(cast(Iterable[Dict[str, object]], prev_words))
+                    prev_words.extend(cast(Iterable[Dict[str, object]], curr_words))
+                    prev["words"] = prev_words
+                continue
 
-        merged.append(current)
+        prev = _clone_segment(seg)
+        merged.append(prev)
+        prev_start, prev_end = current_start, current_end
+        prev_user = seg.get(user_key) if user_key is not None else None
+        owns_files = False
 
     return merged
 
 
 def _format_timestamp(seconds: float, *, separator: str) -> str:
-    seconds = max(0.0, seconds)
-    millis = int(round((seconds - int(seconds)) * 1000))
-    total_seconds = int(seconds)
-    if millis == 1000:
-        total_seconds += 1
-        millis = 0
-    hours, remainder = divmod(total_seconds, 3600)
-    minutes, secs = divmod(remainder, 60)
-    if separator == ",":
-        return f"{hours:02}:{minutes:02}:{secs:02},{millis:03}"
-    return f"{hours:02}:{minutes:02}:{secs:02}.{millis:03}"
+    total_ms = max(0, int(seconds * 1000 + 0.5))
+    hours, total_ms = divmod(total_ms, 3_600_000)
+    minutes, total_ms = divmod(total_ms, 60_000)
+    secs, millis = divmod(total_ms, 1000)
+    return f"{hours:02d}:{minutes:02d}:{secs:02d}{separator}{millis:03d}"
 
 
-def write_srt(
-    segments: Iterable[Mapping[str, object]], path: Path, *, base: float = 0.0
-) -> None:
-    lines = []
+_WRITE_BUFFER_SIZE = 1 << 20
+
+
+def _iter_srt(segments: Iterable[Mapping[str, object]], base: float) -> Iterator[str]:
+    lead = ""
     for idx, seg in enumerate(segments, start=1):
         start = float(cast(SupportsFloat, seg["start"])) - base
         end = float(cast(SupportsFloat, seg["end"])) - base
-        lines.append(str(idx))
-        lines.append(
-            f"{_format_timestamp(start, separator=',')} --> {_format_timestamp(end, separator=',')}"
+        text = str(seg.get("text", "")).strip()
+        yield (
+            f"{lead}{idx}\n"
+            f"{_format_timestamp(start, separator=',')} --> {_format_timestamp(end, separator=',')}\n"
+            f"{text}\n"
         )
-        lines.append(str(seg.get("text", "")).strip())
-        lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+        lead = "\n"
 
 
-def write_vtt(
-    segments: Iterable[Mapping[str, object]], path: Path, *, base: float = 0.0
-) -> None:
-    lines = ["WEBVTT", ""]
+def _iter_vtt(segments: Iterable[Mapping[str, object]], base: float) -> Iterator[str]:
+    yield "WEBVTT\n"
     for seg in segments:
         start = float(cast(SupportsFloat, seg["start"])) - base
         end = float(cast(SupportsFloat, seg["end"])) - base
-        lines.append(
-            f"{_format_timestamp(start, separator='.')} --> {_format_timestamp(end, separator='.')}"
+        text = str(seg.get("text", "")).strip()
+        yield (
+            f"\n{_format_timestamp(start, separator='.')} --> {_format_timestamp(end, separator='.')}\n"
+            f"{text}\n"
         )
-        lines.append(str(seg.get("text", "")).strip())
-        lines.append("")
-    path.write_text("\n".join(lines), encoding="utf-8")
+
+
+def write_srt(
+    segments: Iterable[Mapping[str, object]], path: Path, *, base: float = 0.0
+) -> None:
+    """Stream ``segments`` to ``path`` as SRT, one cue at a time.
+
+    Cues are never collected in memory; the 1 MiB file buffer coalesces the
+    writes. Line endings are always ``\n``, whatever the platform.
+    """
+
+    with path.open("w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE, newline="\n") as handle:
+        handle.writelines(_iter_srt(segments, base))
+
+
+def write_vtt(
+    segments: Iterable[Mapping[str, object]], path: Path, *, base: float = 0.0
+) -> None:
+    """Stream ``segments`` to ``path`` as WebVTT, one cue at a time.
+
+    Cues are never collected in memory; the 1 MiB file buffer coalesces the
+    writes. Line endings are always ``\n``, whatever the platform.
+    """
+
+    with path.open("w", encoding="utf-8", buffering=_WRITE_BUFFER_SIZE, newline="\n") as handle:
+        handle.writelines(_iter_vtt(segments, base))
+
 
 def pick_latest_session(recordings_dir: Path) -> Optional[Path]:
     """Return the newest recording session directory in ``recordings_dir``."""
 
-    sessions = sorted(
-        (p for p in recordings_dir.glob("*") if p.is_dir()),
-        key=lambda p: p.stat().st_mtime,
-        reverse=True,
-    )
-    return sessions[0] if sessions else None
+    latest: Optional[str] = None
+    latest_mtime = 0.0
+    try:
+        with os.scandir(recordings_dir) as entries:
+            for entry in entries:
+                if not entry.is_dir():
+                    continue
+                mtime = entry.stat().st_mtime
+                if latest is None or mtime > latest_mtime:
+                    latest, latest_mtime = entry.path, mtime
+    except OSError:
+        return None
+    return Path(latest) if latest is not None else None
+
+
+class _NormTable(Dict[int, Optional[int]]):
+    """``str.translate`` table keeping word characters and spaces, filled per code point on first use.
+
+    Mirrors the ``[^\\w ]`` filter: ``\\w`` in :mod:`re` is ``str.isalnum()`` plus ``_``.
+    """
 
+    def __missing__(self, codepoint: int) -> Optional[int]:
+        char = chr(codepoint)
+        value = codepoint if char.isalnum() or char in "_ " else None
+        self[codepoint] = value
+        return value
+
+
+_NORM_TABLE = _NormTable()
+
+
+@functools.lru_cache(maxsize=4096)
 def norm_text(t: str) -> str:
-    """Normalise text for fuzzy duplicate detection."""
+    """Normalise text for fuzzy duplicate detection.
+
+    Cached: Whisper tends to repeat short phrases, and duplicates are only
+    ever compared against recent segments.
+    """
+
+    t = t.strip().lower().translate(_NORM_TABLE)
+    return _WS_RE.sub(" ", t)
+
+
+def dedup_timeline(
+    items: Sequence[Dict[str, object]],
+    *,
+    window: float = 1.5,
+    strict: bool = False,
+) -> Tuple[List[Dict[str, object]], List[Dict[str, object]]]:
+    """Split time-ordered ``items`` into ``(kept, dropped)`` repeated utterances.
+
+    An item is dropped when its normalised text matches the previously kept
+    item less than ``window`` seconds earlier. With ``strict`` the earlier
+    item does not have to be adjacent: any kept item with the same text
+    inside the window counts.
+    """
+
+    norms = [norm_text(cast(str, item["text"])) for item in items]
+    kept: List[Dict[str, object]] = []
+    dropped: List[Dict[str, object]] = []
+    if strict:
+        last_seen: Dict[str, float] = {}
+        for item, nt in zip(items, norms, strict=True):
+            t = cast(float, item["pseudo_t"])
+            prev_t = last_seen.get(nt)
+            if prev_t is not None and t - prev_t < window:
+                dropped.append(item)
+                continue
+            kept.append(item)
+            last_seen[nt] = t
+        return kept, dropped
+
+    last_norm = ""
+    last_t = -1e9
+    for item, nt in zip(items, norms, strict=True):
+        t = cast(float, item["pseudo_t"])
+        if kept and nt == last_norm and t - last_t < window:
+            dropped.append(item)
+            continue
+        kept.append(item)
+        last_norm = nt
+        last_t = t
+    return kept, dropped
 
-    t = t.strip().lower()
-    t = re.sub(r"[^\wąćęłńóśżź ]+", "", t)
-    t = re.sub(r"\s+", " ", t)
-    return t
 
 def parse_iso_to_epoch(value: Optional[str]) -> Optional[float]:
     """Parse ISO8601 string to epoch seconds, returning ``None`` if invalid."""
@@ -792,6 +1423,43 @@ def parse_iso_to_epoch(value: Optional[str]) -> Optional[float]:
     except ValueError:
         return None
 
+
+@functools.lru_cache(maxsize=64)
+def _utc_date(day: int) -> str:
+    tm = time.gmtime(day * 86400)
+    return f"{tm.tm_year:04d}-{tm.tm_mon:02d}-{tm.tm_mday:02d}"
+
+
+def _iso_z(epoch: float) -> str:
+    """Format ``epoch`` like ``datetime.fromtimestamp(epoch, tz=utc).isoformat()`` with a ``Z`` suffix.
+
+    Only the date part goes through a (cached) calendar conversion; a session
+    spans a handful of days, so timestamps are mostly integer arithmetic.
+    """
+
+    seconds = int(epoch)
+    # Same half-even microsecond rounding as ``datetime.fromtimestamp``.
+    micros = round((epoch - seconds) * 1e6)
+    if micros >= 1_000_000:
+        seconds += 1
+        micros -= 1_000_000
+    elif micros < 0:
+        seconds -= 1
+        micros += 1_000_000
+    day, rem = divmod(seconds, 86400)
+    clock = f"{_utc_date(day)}T{rem // 3600:02d}:{rem % 3600 // 60:02d}:{rem % 60:02d}"
+    return f"{clock}.{micros:06d}Z" if micros else f"{clock}Z"
+
+
+def _user_file_stub(user_prefix: str) -> str:
+    """Return the output file stem for ``user_prefix`` (``<name>_<discord id>`` from the recorder)."""
+
+    id_candidate = user_prefix.rsplit("_", 1)[-1]
+    if not id_candidate.isdigit():
+        id_candidate = _UNSAFE_ID_RE.sub("_", user_prefix).strip("_") or user_prefix
+    return f"user_{id_candidate}"
+
+
 def _resolve_session_path(config: TranscribeConfig) -> Optional[Path]:
     if config.session_dir:
         if config.session_dir.is_dir():
@@ -808,14 +1476,26 @@ def _relative_session_path(config: TranscribeConfig, session_dir: Path) -> Path:
         return Path(session_dir.name)
 
 
-def main():
-    """Generate per-user and global transcripts for the selected session."""
+def _log_segments(environ: Optional[Mapping[str, str]] = None) -> bool:
+    """Return False when ``LOG_LEVEL`` is set above ``debug`` (per-segment lines off)."""
+
+    source = os.environ if environ is None else environ
+    return source.get("LOG_LEVEL", "").strip().lower() in ("", "debug")
+
+
+def main(argv=None, *, stop_event=None, environ=None, stream=None):
+    """Generate per-user and global transcripts for the selected session.
+
+    ``environ`` replaces ``os.environ`` as the configuration source and all
+    log output goes to ``stream`` (stdout/stderr by default); neither touches
+    process-wide state, so :func:`main_api` can run this from a worker thread.
+    """
 
-    args = parse_args()
-    narrator = NarrativeLogger()
+    args = parse_args(argv)
+    narrator = NarrativeLogger(verbose=_log_segments(environ), stream=stream)
     source = "argumenty CLI + zmienne środowiskowe" if _cli_overrides(args) else "zmienne środowiskowe"
     narrator.log_start("Konfiguracja transkrypcji", {"źródło": source})
-    config = load_config(args)
+    config = load_config(args, environ=environ, stream=stream)
     narrator.log_event(
         "Sprawdzam katalogi robocze",
         {
@@ -853,12 +1533,38 @@ def main():
         )
         sys.exit(1)
 
+    config.output_dir = config.output_dir.resolve()
     output_session_dir = config.output_dir / _relative_session_path(config, session_dir)
     out_dir = output_session_dir / "transcripts"
     out_dir.mkdir(parents=True, exist_ok=True)
 
-    files = sorted(glob.glob(str(raw_dir / "*.wav")))
-    files = [f for f in files if os.path.getsize(f) >= 1024]
+    # One directory read and one stat per file: size and mtime come from the same stat_result,
+    # so ordering the per-user timelines later needs no further syscalls. Hidden files are
+    # skipped like glob("*.wav") did.
+    with os.scandir(raw_dir) as entries:
+        listed = sorted(
+            (entry.path, entry.name, entry.stat())
+            for entry in entries
+            if entry.name.endswith(".wav") and not entry.name.startswith(".") and entry.is_file()
+        )
+    # Reading the header is a few bytes of I/O; a corrupt or near-silent file would cost a full decode.
+    files = []
+    wav_headers: Dict[str, _WavHeader] = {}
+    file_mtimes: Dict[str, float] = {}
+    # Base names come with the listing; every later log line and record reuses them.
+    file_names: Dict[str, str] = {}
+    for path, name, st in listed:
+        header = _probe_wav(path, st.st_size) if st.st_size >= 1024 else None
+        if header is not None and header.duration >= _MIN_WAV_SECONDS:
+            files.append(path)
+            wav_headers[path] = header
+            file_mtimes[path] = st.st_mtime
+            file_names[path] = name
+    if len(files) < len(listed):
+        narrator.log_event(
+            "Pomijam puste lub uszkodzone pliki WAV",
+            {"pominięte": len(listed) - len(files), "próg_s": _MIN_WAV_SECONDS},
+        )
     if not files:
         narrator.log_event("W katalogu RAW panuje cisza", {"ścieżka": raw_dir})
         narrator.log_result(
@@ -969,7 +1675,11 @@ def main():
             )
         else:
             aligner = WhisperWordAligner(
-                WhisperAlignConfig(device=config.device, language_code=config.language)
+                WhisperAlignConfig(
+                    device=config.device,
+                    language_code=config.language,
+                    compute_type="float16" if config.device == "cuda" else "int8",
+                )
             )
             narrator.log_result(
                 "Aligner przygotowany",
@@ -981,138 +1691,209 @@ def main():
 
     buckets: Dict[str, list[str]] = {}
     for f in files:
-        name = os.path.basename(f)
-        user_prefix = name.rsplit("_seg", 1)[0]
+        user_prefix = file_names[f].rsplit("_seg", 1)[0]
         buckets.setdefault(user_prefix, []).append(f)
 
     narrator.log_start(
         "Inferencja segmentów",
-        {"użytkownicy": len(buckets)},
+        {"użytkownicy": len(buckets), "pliki": len(files)},
+    )
+
+    # Alignment runs on its own consumer thread: transcription workers queue finished
+    # files and move on, so Whisper decodes file N+1 while WhisperX aligns file N.
+    # Files that piled up meanwhile go to the aligner as one batch, which reads the
+    # audio of the next files while the current one aligns.
+    align_jobs: "queue.Queue[Optional[Tuple[str, List[Dict[str, object]]]]]" = queue.Queue()
+
+    def _align_batch(batch: List[Tuple[str, List[Dict[str, object]]]]) -> None:
+        assert aligner is not None
+        payloads = [
+            (
+                Path(wav),
+                [{"start": it["start"], "end": it["end"], "text": it["text"]} for it in items],
+            )
+            for wav, items in batch
+        ]
+        outcomes: Sequence[Union[List[List[Dict[str, Any]]], Exception]]
+        try:
+            outcomes = aligner.align_words_batch(payloads, max_workers=_ALIGN_PREFETCH)
+        except Exception as exc:
+            outcomes = [exc] * len(batch)
+        for (wav, items), outcome in zip(batch, outcomes, strict=True):
+            if isinstance(outcome, Exception):
+                narrator.log_event(
+                    "WhisperX nie zgrał słów",
+                    {"plik": file_names[wav], "powód": outcome},
+                )
+                continue
+            # The aligner builds fresh word dicts per file and nothing downstream mutates them.
+            for item, words in zip(items, outcome, strict=False):
+                if words:
+                    item["words_audio"] = words
+
+    def _align_worker() -> None:
+        finished = False
+        while not finished:
+            job = align_jobs.get()
+            if job is None:
+                return
+            batch = [job]
+            while len(batch) < _ALIGN_BATCH_MAX:
+                try:
+                    job = align_jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job is None:
+                    finished = True
+                    break
+                batch.append(job)
+            if stop_event is None or not stop_event.is_set():
+                _align_batch(batch)
+
+    # Identical for every file; built once and only read by the workers.
+    transcribe_kwargs: Dict[str, object] = dict(
+        beam_size=config.beam_size,
+        language=config.language,
+        vad_filter=config.vad_filter,
     )
+    if config.vad_filter:
+        transcribe_kwargs["vad_parameters"] = config.vad_parameters
+    if config.batch_size > 1:
+        transcribe_kwargs["batch_size"] = config.batch_size
+
+    def _transcribe_one(wav: str, file_t0: float) -> List[Dict[str, object]]:
+        """Transcribe one file into timeline items and queue it for alignment."""
+
+        audio = None if config.mock_transcriber else _load_pcm16k(wav, wav_headers[wav])
+        raw_segments, _info = model.transcribe(
+            wav if audio is None else audio, **transcribe_kwargs
+        )
+        # faster-whisper decodes lazily, window by window; check Stop between segments so
+        # files already in flight do not have to run to the end.
+        typed_segments: List[WhisperSegment] = []
+        for seg in cast(Iterable[WhisperSegment], raw_segments):
+            if stop_event is not None and stop_event.is_set():
+                return []
+            typed_segments.append(seg)
+        cleaned = sanitize_texts(
+            [seg.text for seg in typed_segments], lower_noise=config.sanitize_lower_noise
+        )
+        name = file_names[wav]
+        items: List[Dict[str, object]] = []
+        for seg, clean_text in zip(typed_segments, cleaned, strict=True):
+            if not clean_text:
+                continue
+            start = float(seg.start)
+            end = float(seg.end)
+            items.append(
+                {
+                    "pseudo_t": file_t0 + start,
+                    "start": start,
+                    "end": end,
+                    "text": clean_text,
+                    "file": name,
+                    "words_audio": [],
+                }
+            )
+            narrator.log_detail(
+                "Segment dopisany do pergaminu",
+                {
+                    "plik": name,
+                    "zakres_s": f"{start:.2f}-{end:.2f}",
+                    "tekst": clean_text,
+                },
+            )
+
+        if aligner and items:
+            align_jobs.put((wav, items))
+        return items
+
+    # Phase 1: transcribe every file, similar lengths back to back so batched decoding sees
+    # evenly sized inputs. Phase 2 below assembles per-user timelines from the results.
+    # Up to ``num_workers`` files are in flight at once, each on its own model replica.
+    transcribed: Dict[str, List[Dict[str, object]]] = {}
+
+    def _process(wav: str) -> None:
+        try:
+            file_t0 = file_mtimes[wav]
+            narrator.log_event(
+                "Otwieram falę dźwięku",
+                {"plik": file_names[wav], "mtime": file_t0},
+            )
+            transcribed[wav] = _transcribe_one(wav, file_t0)
+        except Exception as e:
+            narrator.log_event(
+                "Pomijam uszkodzony plik",
+                {"plik": file_names[wav], "powód": e},
+            )
 
+    align_thread: Optional[threading.Thread] = None
+    if aligner is not None:
+        align_thread = threading.Thread(target=_align_worker, name="skryba-align", daemon=True)
+        align_thread.start()
+    try:
+        with ThreadPoolExecutor(max_workers=config.num_workers, thread_name_prefix="skryba") as pool:
+            in_flight: set[Future[None]] = set()
+            for wav in sorted(files, key=lambda path: _duration_bucket(wav_headers[path].duration)):
+                if len(in_flight) >= config.num_workers:
+                    _done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                if stop_event is not None and stop_event.is_set():
+                    break
+                in_flight.add(pool.submit(_process, wav))
+    finally:
+        if align_thread is not None:
+            align_jobs.put(None)
+            align_thread.join()
+
+    # Stop may arrive after the last submit: in-flight files finish, but the align worker
+    # drops its queue, so nothing past this point may run or report success.
+    if stop_event is not None and stop_event.is_set():
+        narrator.log_result(
+            "Transkrypcja przerwana na żądanie",
+            {"pliki_przetworzone": len(transcribed), "pliki": len(files)},
+            reflection="Pióro odłożone w pół zdania – dokończymy innym razem.",
+        )
+        sys.exit(130)
+
+    raw_rel = os.path.relpath(raw_dir, session_dir)
     summary_index = []
-    conversation_segments = []
+    # One chronologically sorted row list per user, k-way merged once all users are done.
+    conversation_rows: List[List[Dict[str, object]]] = []
     user_payloads = []
     manifest_transcripts: Dict[str, Dict[str, object]] = {}
     users_processed = 0
     total_segments = 0
 
     for user_prefix, wavs in buckets.items():
-        wavs.sort(key=lambda x: os.path.getmtime(x))
-        timeline = []
-        raw_wavs: List[str] = []
+        wavs = sorted(wavs, key=file_mtimes.__getitem__)
+        raw_wavs: List[str] = [os.path.join(raw_rel, file_names[wav]) for wav in wavs]
+        timeline = [item for wav in wavs for item in transcribed.get(wav, ())]
 
         narrator.log_event(
             "Rozpoczynam nasłuch użytkownika",
             {"użytkownik": user_prefix, "pliki": len(wavs)},
         )
 
-        id_candidate = user_prefix.rsplit("_", 1)[-1]
-        if not id_candidate.isdigit():
-            id_candidate = re.sub(r"[^0-9A-Za-z]+", "_", user_prefix).strip("_") or user_prefix
-        file_stub = f"user_{id_candidate}"
-
-        for wav in wavs:
-            try:
-                file_t0 = os.path.getmtime(wav)
-                narrator.log_event(
-                    "Otwieram falę dźwięku",
-                    {"plik": os.path.basename(wav), "mtime": file_t0},
-                )
-                raw_wavs.append(os.path.relpath(wav, session_dir))
-                transcribe_kwargs = dict(
-                    beam_size=config.beam_size,
-                    language=config.language,
-                    vad_filter=config.vad_filter,
-                )
-                if config.vad_filter:
-                    transcribe_kwargs["vad_parameters"] = config.vad_parameters
-                raw_segments, _info = model.transcribe(wav, **transcribe_kwargs)
-                typed_segments = list(cast(Iterable[WhisperSegment], raw_segments))
-                segment_items: List[Dict[str, object]] = []
-                for seg in typed_segments:
-                    clean_text = sanitize_text(seg.text, lower_noise=config.sanitize_lower_noise)
-                    if not clean_text:
-                        continue
-                    item = {
-                        "start": float(seg.start),
-                        "end": float(seg.end),
-                        "text": clean_text,
-                        "file": os.path.basename(wav),
-                    }
-                    item["pseudo_t"] = file_t0 + item["start"]
-                    segment_items.append(item)
-                    narrator.log_event(
-                        "Segment dopisany do pergaminu",
-                        {
-                            "plik": os.path.basename(wav),
-                            "zakres_s": f"{item['start']:.2f}-{item['end']:.2f}",
-                            "tekst": clean_text,
-                        },
-                    )
-
-                word_segments: List[List[Dict[str, object]]] = []
-                if aligner and segment_items:
-                    align_payload = [
-                        {"start": it["start"], "end": it["end"], "text": it["text"]}
-                        for it in segment_items
-                    ]
-                    try:
-                        word_segments = aligner.align_words(Path(wav), align_payload)
-                    except Exception as exc:
-                        narrator.log_event(
-                            "WhisperX nie zgrał słów",
-                            {"plik": os.path.basename(wav), "powód": exc},
-                        )
-                        word_segments = []
-
-                for idx, item in enumerate(segment_items):
-                    words_audio = word_segments[idx] if idx < len(word_segments) else []
-                    words_audio = [dict(word) for word in words_audio] if words_audio else []
-                    timeline.append(
-                        {
-                            "pseudo_t": item["pseudo_t"],
-                            "start": item["start"],
-                            "end": item["end"],
-                            "text": item["text"],
-                            "file": item["file"],
-                            "words_audio": words_audio,
-                        }
-                    )
-            except Exception as e:
-                narrator.log_event(
-                    "Pomijam uszkodzony plik",
-                    {"plik": os.path.basename(wav), "powód": e},
-                )
-                continue
+        file_stub = _user_file_stub(user_prefix)
 
-        timeline.sort(key=lambda x: x["pseudo_t"])
+        timeline.sort(key=operator.itemgetter("pseudo_t"))
 
         if not timeline:
             narrator.log_event("Brak segmentów po transkrypcji", {"użytkownik": user_prefix})
             continue
 
-        deduped = []
-        last_norm = ""
-        last_t = -1e9
-        for item in timeline:
-            nt = norm_text(item["text"])
-            if deduped and nt == last_norm and (item["pseudo_t"] - last_t) < 1.5:
-                narrator.log_event(
-                    "Pomijam duplikat wypowiedzi",
-                    {"tekst": item["text"], "pseudo_t": item["pseudo_t"]},
-                )
-                continue
-            deduped.append(item)
-            last_norm = nt
-            last_t = item["pseudo_t"]
-        timeline = deduped
+        timeline, duplicates = dedup_timeline(timeline, strict=config.dedup_strict)
+        for item in duplicates:
+            narrator.log_event(
+                "Pomijam duplikat wypowiedzi",
+                {"tekst": item["text"], "pseudo_t": item["pseudo_t"]},
+            )
 
-        session_segments = []
-        segments_all = []
+        # ``timeline`` stays the single record per segment. Only the conversation rows are
+        # built now (soft merge rewrites them); per-user rows are derived when written.
         user_id = user_prefix.rsplit("_", 1)[-1]
-        for item in timeline:
-            conversation_segments.append(
+        conversation_rows.append(
+            [
                 {
                     "user": user_prefix,
                     "text": item["text"],
@@ -1121,45 +1902,43 @@ def main():
                     "files": [item["file"]],
                     "user_id": user_id,
                 }
-            )
-            segments_all.append(
-                {
-                    "start": item["start"],
-                    "end": item["end"],
-                    "text": item["text"],
-                    "file": item["file"],
-                    "session_epoch": item["pseudo_t"],
-                    "words": item.get("words_audio", []),
-                }
-            )
-            session_segments.append(
+                for item in timeline
+            ]
+        )
+
+        write_srt(
+            (
                 {
                     "start": item["pseudo_t"],
                     "end": item["pseudo_t"] + (item["end"] - item["start"]),
                     "text": item["text"],
                 }
-            )
-
-        write_srt(session_segments, out_dir / f"{file_stub}_session.srt")
+                for item in timeline
+            ),
+            out_dir / f"{file_stub}_session.srt",
+        )
 
         user_payloads.append(
             {
                 "user": user_prefix,
                 "user_id": user_id,
                 "file_stub": file_stub,
-                "segments": segments_all,
+                "timeline": timeline,
                 "raw_files": raw_wavs,
             }
         )
-        summary_index.append({"user": user_prefix, "segments": len(segments_all)})
-        total_segments += len(segments_all)
+        summary_index.append({"user": user_prefix, "segments": len(timeline)})
+        total_segments += len(timeline)
         users_processed += 1
 
         narrator.log_event(
             "Zamykam rozdział użytkownika",
-            {"użytkownik": user_prefix, "segmenty": len(segments_all)},
+            {"użytkownik": user_prefix, "segmenty": len(timeline)},
         )
 
+    # Each user's rows are already ordered by start (the timeline is sorted by pseudo_t), so a
+    # merge is enough; ties keep user order exactly like a stable sort of the concatenation.
+    conversation_segments = list(heapq.merge(*conversation_rows, key=operator.itemgetter("start")))
     if not conversation_segments:
         narrator.log_event("Brak danych do osi czasu rozmowy", None)
 
@@ -1175,7 +1954,6 @@ def main():
 
     narrator.log_start("Postprocessing i budowa osi czasu", None)
 
-    conversation_segments.sort(key=lambda item: item["start"])
     conversation_segments = soft_merge_segments(
         conversation_segments,
         user_key="user",
@@ -1195,8 +1973,7 @@ def main():
     manifest_start_iso = None
     if manifest_path.exists():
         try:
-            with open(manifest_path, "r", encoding="utf-8") as f:
-                manifest = json.load(f)
+            manifest = jsonio.read(manifest_path)
             manifest_start_iso = manifest.get("startISO")
             narrator.log_event("Odczytałem manifest sesji", {"plik": manifest_path})
         except (json.JSONDecodeError, OSError) as exc:
@@ -1206,11 +1983,7 @@ def main():
     if session_t0 is None and conversation_segments:
         session_t0 = conversation_segments[0]["start"]
         first_segment_start = session_t0
-        manifest_start_iso = (
-            datetime.fromtimestamp(first_segment_start, tz=timezone.utc)
-            .isoformat()
-            .replace("+00:00", "Z")
-        )
+        manifest_start_iso = _iso_z(first_segment_start)
         narrator.log_event(
             "Szacuję początek sesji na bazie pierwszego segmentu",
             {"epoch": session_t0},
@@ -1219,22 +1992,15 @@ def main():
     timeline_payload = {
         "session_dir": str(session_dir),
         "session_start_iso": manifest_start_iso,
-        "generated_at": datetime.utcnow().replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z"),
+        "generated_at": _iso_z(time.time()),
         "segments": [],
     }
 
     if session_t0 is not None:
-        for user_data in user_payloads:
-            for seg in user_data["segments"]:
-                seg["relative_session_start"] = round(seg["session_epoch"] - session_t0, 2)
-                duration = seg["end"] - seg["start"]
-                seg["relative_session_end"] = round(seg["relative_session_start"] + duration, 2)
         for seg in conversation_segments:
             relative_start = round(seg["start"] - session_t0, 2)
             relative_end = round(seg["end"] - session_t0, 2)
-            absolute_start = (
-                datetime.fromtimestamp(seg["start"], tz=timezone.utc).isoformat().replace("+00:00", "Z")
-            )
+            absolute_start = _iso_z(seg["start"])
             timeline_payload["segments"].append(
                 {
                     "user": seg["user"],
@@ -1268,75 +2034,104 @@ def main():
 
     narrator.log_start("Zapis wyników", {"folder": out_dir})
 
-    for user_data in user_payloads:
-        for seg in user_data["segments"]:
-            seg.pop("session_epoch", None)
+    # Manifest paths are relative to the session; resolve out_dir once instead of per file.
+    out_rel = os.path.relpath(out_dir, session_dir)
+
+    def _write_user_outputs(user_data: Dict[str, Any]) -> Dict[str, object]:
+        """Write one user's JSON/SRT/VTT and return their manifest entry."""
+
+        user_segments = []
+        for item in user_data["timeline"]:
+            seg = {
+                "start": item["start"],
+                "end": item["end"],
+                "text": item["text"],
+                "file": item["file"],
+                "words": item.get("words_audio", []),
+            }
+            if session_t0 is not None:
+                seg["relative_session_start"] = round(item["pseudo_t"] - session_t0, 2)
+                duration = item["end"] - item["start"]
+                seg["relative_session_end"] = round(seg["relative_session_start"] + duration, 2)
+            user_segments.append(seg)
         user_json_path = out_dir / f"{user_data['file_stub']}.json"
         json_payload = {
             "user": user_data["user"],
             "user_id": user_data["user_id"],
-            "segments": user_data["segments"],
+            "segments": user_segments,
             "raw_files": user_data["raw_files"],
         }
-        with open(user_json_path, "w", encoding="utf-8") as f:
-            json.dump(json_payload, f, ensure_ascii=False, indent=2)
+        jsonio.write(user_json_path, json_payload)
         narrator.log_event(
             "Zapisuję indywidualny pergamin",
-            {"plik": user_json_path, "segmenty": len(user_data["segments"])},
+            {"plik": user_json_path, "segmenty": len(user_segments)},
         )
         user_srt_path = out_dir / f"{user_data['file_stub']}.srt"
         user_vtt_path = out_dir / f"{user_data['file_stub']}.vtt"
-        write_srt(user_data["segments"], user_srt_path)
-        write_vtt(user_data["segments"], user_vtt_path)
+        write_srt(user_segments, user_srt_path)
+        write_vtt(user_segments, user_vtt_path)
         narrator.log_event(
             "Tworzę formaty SRT i VTT",
             {"srt": user_srt_path, "vtt": user_vtt_path},
         )
-        manifest_transcripts[user_data["user_id"]] = {
+        return {
             "wav_path": user_data["raw_files"],
-            "json_path": os.path.relpath(user_json_path, session_dir),
-            "srt_path": os.path.relpath(user_srt_path, session_dir),
-            "vtt_path": os.path.relpath(user_vtt_path, session_dir),
+            "json_path": os.path.normpath(os.path.join(out_rel, user_json_path.name)),
+            "srt_path": os.path.normpath(os.path.join(out_rel, user_srt_path.name)),
+            "vtt_path": os.path.normpath(os.path.join(out_rel, user_vtt_path.name)),
         }
 
-    if conversation_srt_segments:
-        base_time = session_t0 if session_t0 is not None else conversation_srt_segments[0]["start"]
+    def _write_conversation_srt() -> None:
+        base_time = cast(
+            float, session_t0 if session_t0 is not None else conversation_srt_segments[0]["start"]
+        )
         conversation_srt_path = out_dir / "all_in_one.srt"
         write_srt(conversation_srt_segments, conversation_srt_path, base=base_time)
         narrator.log_event("Generuję wspólne SRT", {"plik": conversation_srt_path})
 
-    conversation_path = out_dir / "conversation.json"
-    with open(conversation_path, "w", encoding="utf-8") as f:
-        json.dump(timeline_payload, f, ensure_ascii=False, indent=2)
-    narrator.log_event(
-        "Aktualizuję globalną oś czasu",
-        {"plik": conversation_path, "wpisy": len(timeline_payload["segments"])},
-    )
+    def _write_conversation_json() -> None:
+        conversation_path = out_dir / "conversation.json"
+        jsonio.write(conversation_path, timeline_payload)
+        narrator.log_event(
+            "Aktualizuję globalną oś czasu",
+            {"plik": conversation_path, "wpisy": len(timeline_payload["segments"])},
+        )
 
-    index_path = out_dir / "index.json"
-    with open(index_path, "w", encoding="utf-8") as f:
-        json.dump(
+    def _write_index() -> None:
+        index_path = out_dir / "index.json"
+        jsonio.write(
+            index_path,
             {
                 "session_dir": str(session_dir),
-                "generated_at": datetime.utcnow().isoformat() + "Z",
+                "generated_at": _iso_z(time.time()),
                 "items": summary_index,
                 "conversation_segments": len(timeline_payload["segments"]),
             },
-            f,
-            ensure_ascii=False,
-            indent=2,
         )
-    narrator.log_event(
-        "Spisuję indeks",
-        {"plik": index_path, "użytkownicy": len(summary_index)},
-    )
+        narrator.log_event(
+            "Spisuję indeks",
+            {"plik": index_path, "użytkownicy": len(summary_index)},
+        )
+
+    # The files are independent and the writes release the GIL, so they overlap on a small
+    # pool. The manifest lists every user's files and is written last.
+    with ThreadPoolExecutor(
+        max_workers=min(8, len(user_payloads) + 3), thread_name_prefix="skryba-zapis"
+    ) as pool:
+        user_writes = [pool.submit(_write_user_outputs, user_data) for user_data in user_payloads]
+        shared_writes = [pool.submit(_write_conversation_json), pool.submit(_write_index)]
+        if conversation_srt_segments:
+            shared_writes.append(pool.submit(_write_conversation_srt))
+        for user_data, future in zip(user_payloads, user_writes, strict=True):
+            manifest_transcripts[user_data["user_id"]] = future.result()
+        for future in shared_writes:
+            future.result()
 
     if manifest_transcripts:
         manifest.setdefault("transcripts", {})
         manifest["transcripts"] = manifest_transcripts
         try:
-            with open(manifest_path, "w", encoding="utf-8") as f:
-                json.dump(manifest, f, ensure_ascii=False, indent=2)
+            jsonio.write(manifest_path, manifest)
             narrator.log_event("Odświeżam manifest", {"plik": manifest_path})
         except OSError as exc:
             narrator.log_event("Manifest odmówił zapisu", {"powód": exc})
@@ -1350,5 +2145,51 @@ def main():
         reflection="Archiwa napełniły się nowymi rozdziałami – można odkładać pióro.",
     )
 
+
+class _CallbackWriter(io.TextIOBase):
+    """Text stream forwarding every write to a callback."""
+
+    def __init__(self, callback: Callable[[str], object]) -> None:
+        super().__init__()
+        self._callback = callback
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        if text:
+            self._callback(text)
+        return len(text)
+
+
+_main_api_lock = threading.Lock()
+
+
+def main_api(
+    env: Mapping[str, str],
+    log: Callable[[str], object],
+    *,
+    argv: Optional[List[str]] = None,
+    stop_event: Optional[threading.Event] = None,
+) -> int:
+    """Run :func:`main` in-process and return its exit code.
+
+    ``env`` is used instead of the process environment and every log line of
+    the run is passed to ``log``; ``os.environ`` and ``sys.stdout``/``sys.stderr``
+    are left untouched. Runs are serialised and the loaded Whisper model stays
+    cached, so repeated calls skip the model load.
+    """
+
+    writer = _CallbackWriter(log)
+    with _main_api_lock:
+        try:
+            main(argv if argv is not None else [], stop_event=stop_event, environ=env, stream=writer)
+        except SystemExit as exc:
+            if exc.code is None or isinstance(exc.code, int):
+                return exc.code or 0
+            return 1
+    return 0
+
+
 if __name__ == "__main__":
     main()
@@ -8,7 +8,7 @@ import sys
 from dataclasses import dataclass, field
 from pathlib import Path
 from threading import Event, Lock, Thread
-from typing import Dict, Iterable, Optional
+from typing import Dict, Iterable, List, Optional
 
 default_env = {
     "PYTHONUNBUFFERED": "1",
@@ -33,6 +33,7 @@ class TranscriptionTask:
     _log_queue: "queue.Queue[TaskMessage]" = field(default_factory=queue.Queue, init=False)
     _done_event: Event = field(default_factory=Event, init=False)
     _lock: Lock = field(default_factory=Lock, init=False)
+    _pumps: List[Thread] = field(default_factory=list, init=False)
 
     def start(self) -> None:
         with self._lock:
@@ -51,8 +52,12 @@ class TranscriptionTask:
                 env=env,
                 cwd=str(Path.cwd()),
             )
-        Thread(target=self._pump_stream, args=(self.process.stdout, "stdout"), daemon=True).start()
-        Thread(target=self._pump_stream, args=(self.process.stderr, "stderr"), daemon=True).start()
+        self._pumps = [
+            Thread(target=self._pump_stream, args=(self.process.stdout, "stdout"), daemon=True),
+            Thread(target=self._pump_stream, args=(self.process.stderr, "stderr"), daemon=True),
+        ]
+        for pump in self._pumps:
+            pump.start()
         Thread(target=self._watcher, daemon=True).start()
 
     def _pump_stream(self, handle: Optional[object], stream: str) -> None:
@@ -67,6 +72,9 @@ class TranscriptionTask:
         if self.process is None:
             return
         self.process.wait()
+        # Signal completion only once both streams are drained, so wait() implies logs() is complete.
+        for pump in self._pumps:
+            pump.join()
         self._done_event.set()
 
     def stop(self) -> None: